@@ -1,5 +1,7 @@
 # https://www.stefaanlippens.net/circular-imports-type-hints-python.html
-import itertools
+import operator
+import sys
+from typing import Callable
 
 import backend.exceptions
 import backend.helpers as helpers
@@ -9,6 +11,135 @@ from backend.helper_type import Value
 from backend.unify import Term, Num, App, Bool, List, Var, Fun
 
 
+# Implementations of built-ins which need more than a single operator (e.g. because they can cause runtime errors)
+def _divide(a: Value, b: Value) -> Value:
+    try:
+        return a / b
+    except ZeroDivisionError:
+        raise backend.exceptions.AlgotRuntimeError(f"Cannot divide by zero")
+
+
+def _integer_divide(a: Value, b: Value) -> Value:
+    try:
+        return a // b
+    except ZeroDivisionError:
+        raise backend.exceptions.AlgotRuntimeError(f"Cannot do integer division by zero")
+
+
+def _modulo(a: Value, b: Value) -> Value:
+    try:
+        return a % b
+    except ZeroDivisionError:
+        raise backend.exceptions.AlgotRuntimeError(f"Cannot do modulo by zero")
+
+
+def _head(xs: Value) -> Value:
+    try:
+        return xs[0]
+    except IndexError:
+        raise backend.exceptions.AlgotRuntimeError(f"Cannot get first element of {xs}")
+
+
+def _last(xs: Value) -> Value:
+    try:
+        return xs[-1]
+    except IndexError:
+        raise backend.exceptions.AlgotRuntimeError(f"Cannot get last element of {xs}")
+
+
+# NOTE: Shallow copy (as created by slicing) should be fine for tail and init, as lists in the system should only hold
+#  primitive/primary values like ints, floats or bool
+def _tail(xs: Value) -> Value:
+    return xs[1:]
+
+
+def _init(xs: Value) -> Value:
+    return xs[:-1]
+
+
+# If the function passed to map/filter is a built-in taking a single argument (e.g. map not xs), we can hand its
+# implementation directly to Python's map/filter, which loop in C and don't need to wrap each element into a list of
+# arguments. Functions taking more arguments are applied with compute, so applying them to a single element fails with
+# the same (type) error as before.
+# NOTE: Otherwise, the same argument list is reused for every element. This is fine, since functions only read their
+#  arguments while being applied and don't keep a reference to the list of arguments.
+def _map(f: Value, xs: Value) -> Value:
+    if not helpers.takes_single_argument(f.function_signature):
+        return [f.compute([element]) for element in xs]
+    if isinstance(f, BuiltinFunction):
+        return list(map(f._implementation, xs))
+    compute = f.compute_unchecked
+    args = [None]
+    result = []
+    append = result.append
+    for element in xs:
+        args[0] = element
+        append(compute(args))
+    return result
+
+
+def _filter(f: Value, xs: Value) -> Value:
+    if not helpers.takes_single_argument(f.function_signature):
+        return [element for element in xs if f.compute([element])]
+    if isinstance(f, BuiltinFunction):
+        return list(filter(f._implementation, xs))
+    compute = f.compute_unchecked
+    args = [None]
+    result = []
+    append = result.append
+    for element in xs:
+        args[0] = element
+        if compute(args):
+            append(element)
+    return result
+
+
+# Python code checking whether the argument at position {i} has the given primitive type (cp. infer_value_type)
+_PRIMITIVE_TYPE_CHECKS: dict[Term, str] = {Num(): "(t{i} is int or t{i} is float)", Bool(): "t{i} is bool"}
+
+
+# Generated argument validators by the input types they check (cp. _primitive_argument_validator)
+_PRIMITIVE_VALIDATORS: dict[tuple[Term, ...], Callable[[list[Value]], bool]] = {}
+
+
+def _primitive_argument_validator(input_types: tuple[Term, ...]) -> Callable[[list[Value]], bool]:
+    """Returns a function which takes a list of arguments and returns whether they match ``input_types`` (only
+    consisting of Num and Bool) exactly, e.g. for (Num(), Bool()):
+
+    def _validate_num_bool(args):
+        if len(args) != 2:
+            return False
+        t0 = type(args[0])
+        t1 = type(args[1])
+        return (t0 is int or t0 is float) and t1 is bool
+
+    Notes
+    -----
+    Each validator is only generated once per combination of input types and then shared by all built-ins with these
+    input types (e.g. all arithmetic operations).
+    """
+    validator = _PRIMITIVE_VALIDATORS.get(input_types)
+    if validator is None:
+        name = "_validate_" + "_".join(str(input_type).lower() for input_type in input_types)
+        lines = [f"def {name}(args):",
+                 f"    if len(args) != {len(input_types)}:",
+                 f"        return False"]
+        lines += [f"    t{i} = type(args[{i}])" for i in range(len(input_types))]
+        checks = [_PRIMITIVE_TYPE_CHECKS[input_type].format(i=i) for i, input_type in enumerate(input_types)]
+        lines.append(f"    return {' and '.join(checks) or 'True'}")
+        namespace = {}
+        exec(compile("\n".join(lines), "<generated validator>", "exec"), namespace)
+        validator = _PRIMITIVE_VALIDATORS[input_types] = namespace[name]
+    return validator
+
+
+# NOTE: [x] + xs allocates the result only once (with the exact size) and copies xs with a single memcpy, just like
+#  list + list does for concat. Preallocating with [None] * (len(xs) + 1) and slice assignment, or xs.copy() followed by
+#  insert(0, x), are both slower, and [x, *xs] is only faster for very short lists.
+def _cons(x: Value, xs: Value) -> Value:
+    return [x] + xs
+
+
 class BuiltinFunction(Function):
     """Implements built-in functions.
 
@@ -22,6 +153,8 @@ class BuiltinFunction(Function):
         Number that should be unique across all functions that exist in the system
     """
 
+    __slots__ = ("builtin", "_implementation", "_validate_primitive_arguments")
+
     # Set up supported built-ins
 
     # Define variables to make definition of array_operations slightly more readable
@@ -30,13 +163,13 @@ class BuiltinFunction(Function):
     type_variable_1 = Var(f"{helpers.FUNCTION_TYPE_PREFIX}1")
     list_type_variable_1 = List(type_variable_1)
 
-    # Function signature: Num -> Num -> Num
-    arithmetic_operations: dict[str, Term] = dict(itertools.product(["+", "-", "*", "/", "//", "%"],
-                                                                    [App(Num(), App(Num(), Num()))]))
+    # Function signature: Num -> Num -> Num (one instance shared by all arithmetic operations)
+    arithmetic_operations: dict[str, Term] = dict.fromkeys(("+", "-", "*", "/", "//", "%"),
+                                                           App(Num(), App(Num(), Num())))
 
-    # Function signature: # Num -> Num -> Bool
-    comparison_operations: dict[str, Term] = dict(itertools.product(["==", "!=", ">", "<", ">=", "<="],
-                                                                    [App(Num(), App(Num(), Bool()))]))
+    # Function signature: # Num -> Num -> Bool (one instance shared by all comparison operations)
+    comparison_operations: dict[str, Term] = dict.fromkeys(("==", "!=", ">", "<", ">=", "<="),
+                                                           App(Num(), App(Num(), Bool())))
 
     # Function signature: # Bool -> Bool -> Bool
     boolean_operations: dict[str, Term] = {
@@ -65,13 +198,71 @@ class BuiltinFunction(Function):
 
     supported_operations: dict[str, Term] = (arithmetic_operations | comparison_operations | boolean_operations |
                                              list_operations)
+    _supported_names: frozenset[str] = frozenset(supported_operations)
+
+    # Map from names of built-ins to their implementation. An implementation receives the arguments of the built-in in
+    # order, e.g. "-" is called with in0 and in1 and returns in0 - in1
+    # NOTE: The implementation is looked up once in __init__, so compute doesn't need to dispatch on the name of the
+    #  built-in at all (neither by matching it against every supported name, nor by first determining its category)
+    _implementations: dict[str, Callable[..., Value]] = {
+        "+": operator.add,
+        "-": operator.sub,
+        "*": operator.mul,
+        "/": _divide,
+        "//": _integer_divide,
+        "%": _modulo,
+        "==": operator.eq,
+        "!=": operator.ne,
+        ">": operator.gt,
+        "<": operator.lt,
+        ">=": operator.ge,
+        "<=": operator.le,
+        "and": lambda a, b: a and b,
+        "or": lambda a, b: a or b,
+        "not": operator.not_,
+        "len": len,
+        "head": _head,
+        "last": _last,
+        "tail": _tail,
+        "init": _init,
+        "concat": operator.add,
+        "map": _map,
+        "filter": _filter,
+        "cons": _cons
+    }
 
     def __init__(self, builtin: str, function_signature: Fun, unique_id: int):
-        if builtin not in BuiltinFunction.supported_operations:
+        if builtin not in BuiltinFunction._supported_names:
             raise ValueError(f"Invalid builtin {builtin}")
 
         super().__init__(function_signature, unique_id)
-        self.builtin: str = builtin
+        self.builtin: str = sys.intern(builtin)  # Makes comparing names of built-ins cheap
+        self._implementation: Callable[..., Value] = BuiltinFunction._implementations[builtin]
+
+        # If all inputs are primitive (e.g. Num -> Num -> Num), the arguments can be type checked without unification
+        input_types = helpers.decompose_term(function_signature)[:-1]
+        self._validate_primitive_arguments: Callable[[list[Value]], bool] | None = None
+        if all(input_type in (Num(), Bool()) for input_type in input_types):
+            self._validate_primitive_arguments = _primitive_argument_validator(tuple(input_types))
+
+    def check_arguments(self, args: list[Value]) -> list[Value]:
+        """
+        Checks whether the type of the arguments is valid and returns the arguments the function should be computed on
+
+        Notes
+        -----
+        If the function only takes primitive inputs and ``args`` matches them exactly, no unification is needed.
+        Otherwise (including all cases in which the arguments are invalid), this falls back to
+        Function.check_arguments, so the raised errors are the same.
+
+        Raises
+        ------
+        Same as Function.check_arguments(args)
+        """
+        validate = self._validate_primitive_arguments
+        if validate is not None and validate(args):
+            return args
+        return super().check_arguments(args)
 
     def compute(self, args: list[Value]) -> Value:
         """Computes and returns the result of the function given the arguments ``args``
@@ -88,86 +279,33 @@ class BuiltinFunction(Function):
             If a runtime error occurs while the result is being computed (e.g. ZeroDivisionError, IndexError when
             working with list operations like head, last, tail and init)
         """
-        context = self.input_context(args)
-
-        match self.builtin:
-            case "+":
-                return context["in0"] + context["in1"]
-            case "-":
-                return context["in0"] - context["in1"]
-            case "*":
-                return context["in0"] * context["in1"]
-            case "/":
-                try:
-                    return context["in0"] / context["in1"]
-                except ZeroDivisionError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot divide by zero")
-            case "//":
-                try:
-                    return context["in0"] // context["in1"]
-                except ZeroDivisionError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot do integer division by zero")
-            case "%":
-                try:
-                    return context["in0"] % context["in1"]
-                except ZeroDivisionError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot do modulo by zero")
-            case "==":
-                return context["in0"] == context["in1"]
-            case "!=":
-                return context["in0"] != context["in1"]
-            case ">":
-                return context["in0"] > context["in1"]
-            case "<":
-                return context["in0"] < context["in1"]
-            case ">=":
-                return context["in0"] >= context["in1"]
-            case "<=":
-                return context["in0"] <= context["in1"]
-            case "and":
-                return context["in0"] and context["in1"]
-            case "or":
-                return context["in0"] or context["in1"]
-            case "not":
-                return not context["in0"]
-            case "len":
-                return len(context["in0"])
-            case "head":
-                # NOTE: Shallow copy (as created by slicing) should be fine here, as lists in the system should only
-                #  hold primitive/primary values like ints, floats or bool
-                try:
-                    return context["in0"][0]
-                except IndexError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot get first element of {context['in0']}")
-            case "last":
-                try:
-                    return context["in0"][-1]
-                except IndexError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot get last element of {context['in0']}")
-            case "tail":
-                try:
-                    return context["in0"][1:]
-                except IndexError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot get tail of {context['in0']}")
-            case "init":
-                try:
-                    return context["in0"][:-1]
-                except IndexError:
-                    raise backend.exceptions.AlgotRuntimeError(f"Cannot get init of {context['in0']}")
-            case "concat":
-                return context["in0"] + context["in1"]
-            case "map":
-                result = []
-                for element in context["in1"]:
-                    result.append(context["in0"].compute([element]))
-                return result
-            case "filter":
-                result = []
-                for element in context["in1"]:
-                    if context["in0"].compute([element]):
-                        result.append(element)
-                return result
-            case "cons":
-                return [context["in0"]] + context["in1"]
-            case _:
-                assert False, f"Cannot handle {self.builtin} as builtin"
+        return self._implementation(*self.check_arguments(args))
+
+    def compute_unchecked(self, args: list[Value]) -> Value:
+        """Computes and returns the result of the function given the arguments ``args`` without type checking them
+
+        Raises
+        ------
+        AlgotRuntimeError
+            If a runtime error occurs while the result is being computed (e.g. ZeroDivisionError, IndexError when
+            working with list operations like head, last, tail and init)
+        """
+        return self._implementation(*args)
+
+    def with_unique_id(self, unique_id: int) -> "BuiltinFunction":
+        """Returns a copy of this built-in with the unique id ``unique_id``
+
+        Notes
+        -----
+        Cheaper than constructing the built-in from scratch, since the signature-derived attributes (input signature,
+        argument validator) are shared instead of being determined again. They are never changed after construction.
+        """
+        clone = BuiltinFunction.__new__(BuiltinFunction)
+        clone.function_signature = self.function_signature
+        clone.unique_id = unique_id
+        clone._input_signature = self._input_signature
+        clone._accepted_signatures = set()
+        clone.builtin = self.builtin
+        clone._implementation = self._implementation
+        clone._validate_primitive_arguments = self._validate_primitive_arguments
+        return clone
@@ -1,8 +1,91 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from backend.builtin_function import BuiltinFunction
+from backend.exceptions import AlgotRuntimeError
 from backend.function import Function
-from backend.helper_type import Value
+from backend.helper_type import Value, Instruction
+from backend.helpers import takes_single_argument
 from backend.tree import Tree
 from backend.unify import Fun
 
+# Name of the (internal) instruction which applies a chain of map/filter applications in a single pass:
+# ("<temp_name>", ["fused", "<list>", "<map/filter>", "<f_name0>", "<map/filter>", "<f_name1>", ...])
+# The chain can end with ("head", "<f_name>"), in which case the first element of the result is returned
+FUSED = "fused"
+
+
+# Built-ins used to type check the application of each map/filter stage (cp. _apply_stages). Only their signature is
+# needed for that, so they don't need a unique id.
+_STAGE_BUILTINS: dict[str, BuiltinFunction] = {
+    kind: BuiltinFunction(kind, BuiltinFunction.supported_operations[kind], -1) for kind in ("map", "filter")
+}
+
+
+def _apply_stages(stages: list[tuple[str, Function]], xs: list[Value]) -> Value:
+    """Applies the map/filter ``stages`` to the elements of ``xs`` in a single pass and returns the resulting list.
+    If the last stage is head, returns the first element of the resulting list instead.
+
+    Notes
+    -----
+    Equivalent to applying the stages one after another, e.g. [("map", f), ("filter", p)] is the same as
+    filter p (map f xs), but without building the intermediate lists. The application of each stage is type checked
+    (just like map/filter check their arguments) before the stage is applied to its first element. Since the type of a
+    list is determined by its first element (cp. infer_value_type), checking with that element is the same as checking
+    with the whole intermediate list. Functions are applied to the elements just like map/filter apply them, i.e.
+    functions taking more than one argument are applied with compute (cp. _map in builtin_function).
+    The only difference is the order of evaluation: All stages are applied to an element before the next element is
+    processed. If errors would be raised for several elements in different stages, the error of the first of these
+    elements is raised (instead of the error of the earliest stage).
+    With head as the last stage, all elements are still processed (so errors raised for later elements are raised just
+    like without fusion), only the resulting list is not returned.
+
+    Raises
+    ------
+    TypeError
+        If the application of a stage cannot be type checked successfully (cp. Function.check_arguments)
+    AlgotRuntimeError
+        If the last stage is head and the resulting list is empty
+    Same as the compute method of the functions of the stages
+    """
+    take_first = stages[-1][0] == "head"
+    if take_first:
+        stages = stages[:-1]
+
+    # [kind, function, how the function is applied to an element, whether the application of the stage is checked]
+    applications = [[kind, f, f.compute_unchecked if takes_single_argument(f.function_signature) else f.compute, False]
+                    for kind, f in stages]
+    _STAGE_BUILTINS[stages[0][0]].check_arguments([stages[0][1], xs])
+    applications[0][3] = True
+
+    args = [None]  # Reused for every application (cp. _map in builtin_function)
+    result = []
+    for element in xs:
+        for application in applications:
+            kind, f, compute, checked = application
+            if not checked:
+                _STAGE_BUILTINS[kind].check_arguments([f, [element]])
+                application[3] = True
+            args[0] = element
+            if kind == "map":
+                element = compute(args)
+            elif not compute(args):  # kind == "filter"
+                break
+        else:
+            result.append(element)
+
+    # Stages that no element has reached are applied to an empty list
+    for kind, f, _, checked in applications:
+        if not checked:
+            _STAGE_BUILTINS[kind].check_arguments([f, []])
+
+    if take_first:
+        if not result:
+            raise AlgotRuntimeError(f"Cannot get first element of {result}")
+        return result[0]
+    return result
+
 
 class CustomFunction(Function):
     """Implements a user-defined function
@@ -18,69 +101,190 @@ class CustomFunction(Function):
     unique_id
         Number that should be unique across all functions that exist in the system
     """
+
+    __slots__ = ("_instructions", "_constants", "_blocks", "_compiled")
+
     def __init__(self, function_signature: Fun, instructions: Tree, constants: dict[str, Value], unique_id: int):
         super().__init__(function_signature, unique_id)
         self._instructions: Tree = instructions
         self._constants: dict[str, Value] = constants
+        self._blocks: dict[Tree, list[Instruction]] = self._fuse_instructions()
+        # NOTE: We store a plain function (instead of e.g. a closure over self), so copies of the function created by
+        #  deepcopy (see State/Snapper) can share it
+        self._compiled: Callable[[CustomFunction, list[Value]], Value] = self._compile_instructions()
 
-    def initial_context(self, args: list[Value]) -> dict[str, Value]:
-        """Generates and returns the initial context.
-        This allows that all values (including inputs and constants) can be referred to by name by instructions.
+    def compute(self, args: list[Value]) -> Value:
+        """Computes and returns the result of the function given the arguments ``args``
 
         Raises
         ------
         NoneAsFunArg
             If the function receives None as an argument (i.e. None is in args)
         ValueError
-            If args is empty even though the function expects at least one argument
+            If args is empty even though the function expects at least one argument OR
+            If the branch to be taken doesn't exist (e.g. executing compute(args) before function synthesis has fully
+            terminated)
         TypeError
             If unification fails (i.e. expected types of arguments don't match received types of arguments)
+        IndexError
+            If next instruction doesn't exist (e.g. missing return due to executing compute(args) before function
+            synthesis has fully terminated)
         """
-        return self.input_context(args) | self._constants
+        return self._compiled(self, self.check_arguments(args))
 
-    def compute(self, args: list[Value]) -> Value:
-        """Computes and returns the result of the function given the arguments ``args``
+    def compute_unchecked(self, args: list[Value]) -> Value:
+        """Computes and returns the result of the function given the arguments ``args`` without type checking them
 
         Raises
         ------
-        NoneAsFunArg
-            If the function receives None as an argument (i.e. None is in args)
         ValueError
-            If args is empty even though the function expects at least one argument
-        TypeError
-            If unification fails (i.e. expected types of arguments don't match received types of arguments)
+            If the branch to be taken doesn't exist
         IndexError
             If next instruction doesn't exist (e.g. missing return due to executing compute(args) before function
             synthesis has fully terminated)
         """
-        context: dict[str, Value] = self.initial_context(args)
-        block_counter: int = 0
-        current_node: Tree = self._instructions
+        return self._compiled(self, args)
+
+    def _compile_instructions(self) -> Callable[[CustomFunction, list[Value]], Value]:
+        """Translates the (fused) instruction blocks into the source code of a Python function, which is then compiled
+        and returned. The function takes the custom function and the arguments, and returns the result.
+
+        Examples
+        --------
+        The instructions [("temp0", ["const0", "in0", "const1"]), (None, ["ret", "temp0"])] are translated into
+
+        def _compiled(self, args):
+            const0 = self._constants["const0"]
+            const1 = self._constants["const1"]
+            in0 = args[0]
+            temp0 = const0.compute([in0, const1])
+            return temp0
+
+        Notes
+        -----
+        All names in instructions (inX, constX, tempX) are valid Python identifiers, so they can be used as local
+        variables. Applications are still done via compute(args), so type checks and runtime errors are the same as if
+        the instructions were interpreted one after another. The exception are fused map/filter chains, which are
+        checked like the applications they replace, but evaluate them in a different order (cp. _apply_stages). If an
+        instruction or branch is missing, the generated code raises the same error that interpreting the (incomplete)
+        tree would raise.
+        """
+        names = {name for block in self._blocks.values() for _, expr in block for name in expr}
+        inputs = [name for name in names if name.startswith("in") and name[2:].isdigit()]
+
+        lines = ["def _compiled(self, args):"]
+        lines += [f"    {name} = self._constants[{name!r}]" for name in self._constants if name in names]
+        lines += [f"    {name} = args[{name[2:]}]" for name in inputs]
+        self._compile_block(self._instructions, 1, lines)
 
-        while True:
-            tmp_name, expr = current_node.get_instruction(block_counter)
+        namespace = {"_apply_stages": _apply_stages}
+        exec(compile("\n".join(lines), f"<custom function {self.unique_id}>", "exec"), namespace)
+        return namespace["_compiled"]
 
+    def _compile_block(self, node: Tree, depth: int, lines: list[str]) -> None:
+        """Appends the source code of the (fused) instruction block of ``node`` (including the blocks of the branches
+        following it) to ``lines``, indented by ``depth`` levels"""
+        indent = "    " * depth
+        for tmp_name, expr in self._blocks[node]:
             if expr[0] == "ret":  # Instruction: (None, ["ret" "<name>"])
-                return context[expr[1]]
+                lines.append(f"{indent}return {expr[1]}")
+                return
 
             elif expr[0] == "branch":  # Instruction: (None, ["branch", "<name>"])
-                cnd_val = context[expr[1]]
-                current_node = current_node.get_true() if cnd_val else current_node.get_false()
-                block_counter = 0
+                lines.append(f"{indent}if {expr[1]}:")
+                self._compile_branch(node.get_true, depth + 1, lines)
+                lines.append(f"{indent}else:")
+                self._compile_branch(node.get_false, depth + 1, lines)
+                return
 
             elif expr[0] == "self":  # Instruction: ("<temp_name>", ["self", "<arg0>", "<arg1>", ...])
-                f_args = [context[arg] for arg in expr[1:]]
-                context[tmp_name] = self.compute(f_args)
+                lines.append(f"{indent}{tmp_name} = self.compute([{', '.join(expr[1:])}])")
+
+            elif expr[0] == FUSED:  # Instruction: ("<temp_name>", ["fused", "<list>", "<kind0>", "<f_name0>", ...])
+                stages = ", ".join(f"({kind!r}, {f_name})" for kind, f_name in zip(expr[2::2], expr[3::2]))
+                lines.append(f"{indent}{tmp_name} = _apply_stages([{stages}], {expr[1]})")
+
+            else:  # Instruction: ("<temp_name>", ["<f_name>", "<arg0>", "<arg1>", ...])
+                lines.append(f"{indent}{tmp_name} = {expr[0]}.compute([{', '.join(expr[1:])}])")
+
+        # Block ended without ret/branch: the next instruction doesn't exist (yet)
+        lines.append(f"{indent}raise IndexError('list index out of range')")
+
+    def _compile_branch(self, get_child: Callable[[], Tree], depth: int, lines: list[str]) -> None:
+        """Appends the source code of the child returned by ``get_child`` to ``lines`` or code raising the error
+        get_child raises if the child doesn't exist (yet)"""
+        try:
+            child = get_child()
+        except ValueError as e:
+            lines.append(f"{'    ' * depth}raise ValueError({str(e)!r})")
+            return
+        self._compile_block(child, depth, lines)
+
+    def _get_stage_kind(self, expr: list[str]) -> str | None:
+        """Returns "map"/"filter" if ``expr`` applies the built-in map/filter (as a constant) to a function and a list,
+        or "head" if ``expr`` applies the built-in head (as a constant) to a list. Otherwise, returns None."""
+        f = self._constants.get(expr[0])
+        if not isinstance(f, BuiltinFunction):
+            return None
+        if len(expr) == 3 and f.builtin in ("map", "filter"):
+            return f.builtin
+        if len(expr) == 2 and f.builtin == "head":
+            return f.builtin
+        return None
+
+    def _fuse_instructions(self) -> dict[Tree, list[Instruction]]:
+        """Returns a map from the nodes of the instruction tree to their instruction blocks, where chains of map/filter
+        applications are fused into a single instruction.
+
+        Notes
+        -----
+        An application like temp1 = map f xs is fused into its consumer temp2 = map g temp1 (or filter, or head) if
+        temp1 is not used anywhere else in the tree and both are in the same block. A chain with several links is fused
+        into ("temp2", ["fused", "xs", "map", "f", "map", "g"]), which computes temp2 without materializing temp1.
+        A chain can also end with head, which then returns the first element of the resulting list (cp. _apply_stages).
+        The tree itself is not modified, as it might still be extended during demonstration.
+        """
+        nodes = [self._instructions]
+        for node in nodes:  # Collects all nodes, since nodes grows while iterating
+            nodes.extend(node.get_children())
+
+        # Count how often each name is used as an operand by any instruction
+        uses: dict[str, int] = {}
+        for node in nodes:
+            for _, expr in node.get_instructions():
+                for name in (expr[1:] if expr[0] in ("ret", "branch", "self") else expr):
+                    uses[name] = uses.get(name, 0) + 1
+
+        blocks: dict[Tree, list[Instruction]] = {}
+        for node in nodes:
+            block = node.get_instructions()
+            # Names that are passed as the list to a map/filter/head application in this block
+            stage_inputs = {expr[-1] for _, expr in block if self._get_stage_kind(expr) is not None}
+            pending: dict[str, list[str]] = {}  # Maps temps that are fused into their consumer to their stages so far
 
-                block_counter += 1
+            fused_block: list[Instruction] = []
+            for tmp_name, expr in block:
+                kind = self._get_stage_kind(expr)
+                if kind is None:
+                    fused_block.append((tmp_name, expr))
+                    continue
 
-            elif expr[0] in context:  # Instruction: ("<temp_name>", ["<f_name>", "<arg0>", "<arg1>", ...])
-                f = context[expr[0]]
-                f_args = [context[arg] for arg in expr[1:]]
+                if kind == "head":  # head can only end a chain
+                    if expr[1] in pending:
+                        fused_block.append((tmp_name, [FUSED] + pending.pop(expr[1]) + [kind, expr[0]]))
+                    else:
+                        fused_block.append((tmp_name, expr))
+                    continue
 
-                context[tmp_name] = f.compute(f_args)
+                f_name, list_name = expr[1], expr[2]
+                stages = pending.pop(list_name, [list_name]) + [kind, f_name]
+                if uses.get(tmp_name, 0) == 1 and tmp_name in stage_inputs:  # Only consumer is a later map/filter/head
+                    pending[tmp_name] = stages
+                elif len(stages) == 3:  # Nothing to fuse
+                    fused_block.append((tmp_name, expr))
+                else:
+                    fused_block.append((tmp_name, [FUSED] + stages))
 
-                block_counter += 1
+            blocks[node] = fused_block
 
-            else:
-                assert False, f"Cannot evaluate {expr[0]}"
+        return blocks
@@ -1,23 +1,56 @@
-import copy
+import sys
+from typing import Hashable
 
 from backend.custom_function import CustomFunction
 from backend.function import Function
 from backend.helper_type import Value, Expr, Instruction, Path
 from backend.helpers import infer_value_type, combine_into_app
 from backend.tree import Tree
-from backend.unify import Equation, Term, Var, alpha_conversion, unify, Bool
+from backend.unify import Equation, Term, Var, App, NoSolutionError, alpha_conversion, unify, Bool
 
 ABSTRACT_TYPE_SIG = "w_sig"  # Type variable representing the final signature (cp. unification in generate_function)
 ABSTRACT_TYPE_PREFIX = "w"  # Prefix of type variables for abstract types (internal to function)
 ABSTRACT_TYPE_OUTPUT = "w_out"  # Name of return type of the function to be synthesized
 
+# Pools of pre-built (interned) names for the most common indices, so generating a name usually doesn't need to format
+# a new string. Interning also makes lookups of these names in dicts (e.g. _types) cheaper.
+_INPUT_NAMES: tuple[str, ...] = tuple(sys.intern(f"in{i}") for i in range(64))
+_TEMP_NAMES: tuple[str, ...] = tuple(sys.intern(f"temp{i}") for i in range(256))
+
+
+def _pooled_name(pool: tuple[str, ...], prefix: str, index: int) -> str:
+    """Returns the name ``prefix`` + ``index``, taking it from ``pool`` if index is small enough"""
+    return pool[index] if index < len(pool) else f"{prefix}{index}"
+
+
+def _constant_key(value: Value) -> Hashable:
+    """Returns a hashable key for ``value``, such that two constants have the same key iff they are considered equal
+
+    Notes
+    -----
+    Functions are equal iff they have the same unique_id. Other values are compared using ==, which is what the dict
+    lookup of the returned key does as well (e.g. 1 and 1.0 get equal keys, just like [1] and [1.0]).
+    """
+    if isinstance(value, Function):
+        return Function, value.unique_id
+    if isinstance(value, list):
+        return list, tuple(value)
+    return value
+
 
 class Demonstration:
     """Keeps track of information related to example demonstration and function synthesis"""
 
+    # Avoids a per-instance dict (all attributes are set in __init__)
+    __slots__ = ("_constants", "_constant_names", "_next_id_constants", "_inputs", "_next_id_inputs", "_types",
+                 "_next_id_type", "_temps", "_next_id_temps", "_new_branch", "_prev_next_id_temps", "_recursive_calls",
+                 "_tree", "_current_node", "_block_counter", "_constraints", "_unified_constraints",
+                 "_num_unified_constraints")
+
     def __init__(self):
         # Represent constant by names s.t. instruction can refer to values by a name
         self._constants: dict[str, Value] = {}
+        self._constant_names: dict[Hashable, str] = {}  # Mapping from (keys of) values back to their constant name
         self._next_id_constants: int = 0
 
         self._inputs: dict[str, str] = {}  # Mapping from names in state to inX
@@ -46,6 +79,9 @@ class Demonstration:
         self._block_counter: int = 0
 
         self._constraints: list[Equation] = []  # Type constraints
+        # Result of unifying the first _num_unified_constraints constraints (cp. _unify_constraints)
+        self._unified_constraints: list[Equation] = []
+        self._num_unified_constraints: int = 0
 
     def __str__(self):
         return (f"Temporaries assignments: {self._temps}\n"
@@ -111,20 +147,17 @@ class Demonstration:
         _constants with a new name first.
         """
         # Check whether constant for that value already exists
-        for k, v in self._constants.items():
-            # If both values are functions, compare them by their unique_id
-            if isinstance(v, Function) and isinstance(value, Function):
-                if v.unique_id == value.unique_id:
-                    return k
-            else:
-                if v == value:
-                    return k
+        key = _constant_key(value)
+        if key in self._constant_names:
+            return self._constant_names[key]
 
         const_name = f"const{self._next_id_constants}"
+        self._constant_names[key] = const_name
         const_type = infer_value_type(value)
 
-        # NOTE: Constants should not be able to change - hence we need a copy.
-        self._constants[const_name] = copy.deepcopy(value)
+        # NOTE: Constants should not be able to change - hence we need a copy. A shallow copy is enough: Lists only hold
+        #  primitive values like ints, floats or bools, and functions are not modified after they have been created.
+        self._constants[const_name] = list(value) if isinstance(value, list) else value
         self._next_id_constants += 1
 
         # Type of constant is the type of the actual value
@@ -148,7 +181,7 @@ class Demonstration:
         two inputs in0 and in1 and returns in0 + in1)
         """
         if s_in not in self._inputs:  # First time the register/list/function gets used as an input
-            input_name = f"in{self._next_id_inputs}"
+            input_name = _pooled_name(_INPUT_NAMES, "in", self._next_id_inputs)
 
             self._inputs[s_in] = input_name
             self._next_id_inputs += 1
@@ -193,7 +226,7 @@ class Demonstration:
             If the generated instruction does not match the expected instruction
         """
         self._switch_next_id_temps()
-        temp_name = f"temp{self._next_id_temps}"
+        temp_name = _pooled_name(_TEMP_NAMES, "temp", self._next_id_temps)
         instr = (temp_name, expr)
 
         self._add_instruction(instr)
@@ -206,11 +239,13 @@ class Demonstration:
             self._types[temp_name] = Var(f"{ABSTRACT_TYPE_PREFIX}{self._next_id_type}")
             self._next_id_type += 1
 
+        types = self._types
         # Determine LHS: Expected types
-        lhs = self._types[expr[0]]
-        # Determine RHS: Given types (i.e. in and temp type)
-        rhs_types = [self._types[key] for key in expr[1:]] + [self._types[temp_name]]
-        rhs = combine_into_app(rhs_types)
+        lhs = types[expr[0]]
+        # Determine RHS: Given types (i.e. in and temp type), combined into arg0 -> arg1 -> ... -> temp
+        rhs = types[temp_name]
+        for key in reversed(expr[1:]):
+            rhs = App(types[key], rhs)
 
         self._constraints.append((lhs, rhs))
         return temp_name
@@ -232,7 +267,7 @@ class Demonstration:
             If the generated instruction does not match the expected instruction
         """
         self._switch_next_id_temps()
-        temp_name = f"temp{self._next_id_temps}"
+        temp_name = _pooled_name(_TEMP_NAMES, "temp", self._next_id_temps)
         instr = (temp_name, expr)
 
         self._add_instruction(instr)
@@ -248,10 +283,14 @@ class Demonstration:
 
         # Types of the input of the function need to match the types of the arguments passed to the recursive call
         # Temp has the same type as the output of the function
-        lhs_types = [self._types[input_name] for input_name in self._inputs.values()] + [Var(ABSTRACT_TYPE_OUTPUT)]
-        lhs = combine_into_app(lhs_types)
-        rhs_types = [self._types[key] for key in expr[1:]] + [self._types[temp_name]]
-        rhs = combine_into_app(rhs_types)
+        # Both sides are combined into a chain of App (cp. combine_into_app) from the right
+        types = self._types
+        lhs = Var(ABSTRACT_TYPE_OUTPUT)
+        for input_name in reversed(self._inputs.values()):
+            lhs = App(types[input_name], lhs)
+        rhs = types[temp_name]
+        for key in reversed(expr[1:]):
+            rhs = App(types[key], rhs)
 
         self._constraints.append((lhs, rhs))
         return temp_name
@@ -324,7 +363,11 @@ class Demonstration:
         types = [self._types[input_name] for input_name in self._inputs.values()] + [Var(ABSTRACT_TYPE_OUTPUT)]
         # Cannot add this constraint permanently to self._constraints - otherwise we would get a contradiction in
         # subsequent recursive calls if the number of arguments increases
-        unified_constraints = unify(self._constraints + [(Var(ABSTRACT_TYPE_SIG), combine_into_app(types))])
+        signature_constraint = (Var(ABSTRACT_TYPE_SIG), combine_into_app(types))
+        try:
+            unified_constraints = unify(self._unify_constraints() + [signature_constraint])
+        except (NoSolutionError, ValueError):  # Raise the same error unifying all constraints at once would raise
+            unified_constraints = unify(self._constraints + [signature_constraint])
 
         # Find unified function signature
         function_signature = None
@@ -365,6 +408,29 @@ class Demonstration:
         return self.is_valid_temp(name)
 
     # "Private" methods
+    def _unify_constraints(self) -> list[Equation]:
+        """Unifies the type constraints and returns the result
+
+        Notes
+        -----
+        Constraints are only ever appended, so we keep the result of the previous call and only unify it together with
+        the constraints added since then (instead of unifying all constraints from scratch every time generate_function
+        is called, e.g. for every recursive call during demonstration). The result is equivalent to unifying all
+        constraints at once, up to the names of type variables which are unified with each other.
+
+        Raises
+        ------
+        NoSolutionError
+            If unification failed (rule "conflict" or "check")
+        ValueError
+            If unification result contains an unsupported type
+        """
+        new_constraints = self._constraints[self._num_unified_constraints:]
+        if new_constraints:
+            self._unified_constraints = unify(self._unified_constraints + new_constraints)
+            self._num_unified_constraints = len(self._constraints)
+        return self._unified_constraints
+
     def _get_expected(self) -> Instruction | None:
         """Returns expected instruction. If no instruction is expected, returns None"""
         try:
@@ -10,6 +10,9 @@ if TYPE_CHECKING:
 import backend.helpers as helpers
 from backend.unify import Term, unify, NoSolutionError, App, Var, Num, Bool, List
 
+# Maximum number of accepted argument signatures a function remembers (cp. Function.check_arguments)
+_MAX_ACCEPTED_SIGNATURES = 32
+
 
 class Function:
     """Basic functionality expected to be supported by functions
@@ -29,20 +32,43 @@ class Function:
     unique_id is used to check whether two functions are the same (they are the same iff they have the same unique_id)
     """
 
+    # Functions are created often (e.g. for every recursive call during demonstration), so we avoid per-instance dicts
+    __slots__ = ("function_signature", "unique_id", "_input_signature", "_accepted_signatures")
+
     def __init__(self, function_signature: Term, unique_id: int):
         self.function_signature: Term = function_signature
         self.unique_id: int = unique_id  # Needed for reliable comparison
 
+        # The signature doesn't change after construction, so we only need to determine the part describing the inputs
+        # once. It is None if the function doesn't take any arguments.
+        self._input_signature: Term | None = None
+        if isinstance(function_signature, App):
+            self._input_signature = helpers.drop_last_type_app(function_signature)
+        # Argument signatures which are known to unify with the input signature (cp. check_arguments)
+        self._accepted_signatures: set[Term] = set()
+
+    def __deepcopy__(self, memo: dict) -> Function:
+        """Returns the function itself
+
+        Notes
+        -----
+        Functions are not modified after they have been stored (cp. Functions.__deepcopy__), so snapshots containing a
+        function (e.g. as the value of a constant or temporary in a demonstration) can share it instead of copying its
+        signature and instructions.
+        """
+        return self
+
     def __str__(self):
         return str(self.function_signature)  # NOTE: Maybe the string representation should include more information?
 
-    def input_context(self, args: list["Value"]) -> dict[str, "Value"]:
+    def check_arguments(self, args: list["Value"]) -> list["Value"]:
         """
-        Checks whether the type of the arguments is valid and returns input context
+        Checks whether the type of the arguments is valid and returns the arguments the function should be computed on
 
         Notes
         -----
-        The input context is a map from names to values. This allows the function to refer to all values by name.
+        The returned arguments are in the same order as the inputs of the function, i.e. the i-th element is the value
+        of in{i}. If the function doesn't take any arguments, an empty list is returned.
 
         Raises
         ------
@@ -53,36 +79,48 @@ class Function:
         TypeError
             If unification fails (i.e. expected types of arguments don't match received types of arguments)
         """
-        input_context: dict[str, "Value"] = {}
-
+        # NOTE: compute_unchecked does not go through check_arguments, so this check is only done for applications
+        #  whose arguments can actually be None (i.e. results of recursive calls during demonstration). For the
+        #  per-element calls of map/filter the check is skipped, as elements of lists are never None.
         if None in args:
             raise NoneAsFunArg(f"Arguments {args} contain None - cannot compute.")
 
         # Check whether function actually takes any arguments
-        match self.function_signature:
-            case App(_, _):
-                pass
-            case Var(_) | Num() | Bool() | List(_):
-                return {}
-            case _:
-                assert False, f"Pattern matching inside input_context failed: received function_signature " \
-                              f"{self.function_signature}"
-
-        # Do type checking
+        function_input_signature = self._input_signature
+        if function_input_signature is None:
+            assert isinstance(self.function_signature, (Var, Num, Bool, List)), \
+                f"Type check inside check_arguments failed: received function_signature {self.function_signature}"
+            return []
+
+        # Do type checking. Whether unification succeeds only depends on the argument signature, so we remember the
+        # signatures that were accepted before (functions are usually applied to arguments of the same types).
         argument_signature = helpers.infer_argument_signature(args)
-        function_input_signature = helpers.drop_last_type_app(self.function_signature)
+        if argument_signature in self._accepted_signatures:
+            return args
         try:
             unify([(argument_signature, function_input_signature)])
         except NoSolutionError as e:
             raise TypeError(f"Unification failed: {e}")
 
-        # Generate input context
-        i = 0
-        for argument in args:
-            input_context[f"in{i}"] = argument
-            i += 1
+        if len(self._accepted_signatures) < _MAX_ACCEPTED_SIGNATURES:
+            self._accepted_signatures.add(argument_signature)
+        return args
+
+    # Child classes can override this if they can skip work when the arguments are known to be valid
+    def compute_unchecked(self, args: list["Value"]) -> "Value":
+        """Computes and returns the result of the function given the arguments ``args`` without checking them first
+
+        Notes
+        -----
+        Only use this if the types of ``args`` are already known to match the function signature and ``args`` does
+        not contain None, e.g. when map/filter apply a function to the elements of a list after the application of
+        map/filter itself has been type checked.
 
-        return input_context
+        Raises
+        ------
+        Same as compute(args)
+        """
+        return self.compute(args)
 
     # Child classes need to override this
     def compute(self, args: list["Value"]) -> "Value":
@@ -1,4 +1,4 @@
-import copy
+import sys
 
 from backend.builtin_function import BuiltinFunction
 from backend.custom_function import CustomFunction
@@ -17,14 +17,35 @@ class Functions:
         return (f"Builtins: {list(self._builtin.keys())}\n"
                 f"Custom: { {k: str(v.function_signature) for k, v in self._custom.items()} }")
 
+    def __deepcopy__(self, memo: dict) -> "Functions":
+        """Returns a copy of the maps from names to functions, which shares the functions themselves
+
+        Notes
+        -----
+        Functions are not modified after they have been stored (built-ins after their creation, custom functions after
+        their demonstration has been finished), so sharing them doesn't allow changes of one copy to affect another.
+        """
+        result = Functions()
+        result._builtin = dict(self._builtin)
+        result._custom = dict(self._custom)
+        result._next_id_custom = self._next_id_custom
+        memo[id(self)] = result
+        return result
+
     def get_custom_names(self) -> list[str]:
         """Returns a list of the names of all custom functions"""
         return list(self._custom.keys())
 
     def get_builtins(self) -> dict[str, BuiltinFunction]:
         """Returns a map from the names of built-in functions to their respective implementation. (Includes all built-in
-        functions in the system)"""
-        return copy.deepcopy(self._builtin)
+        functions in the system)
+
+        Notes
+        -----
+        Only the map is copied. Built-in functions are not modified after they have been created, so they can be
+        shared safely.
+        """
+        return dict(self._builtin)
 
     def get_all_functions(self) -> dict[str, Function]:
         """Returns a map from the names of functions to their respective implementation. (Includes all functions, both
@@ -33,7 +54,7 @@ class Functions:
 
     def is_valid_function(self, function_name: str) -> bool:
         """Returns whether a function with the name ``function_name`` exists"""
-        return function_name in self.get_all_functions()
+        return function_name in self._custom or function_name in self._builtin
 
     def get_function(self, function_name: str) -> Function:  # NOTE: Do we really want to return a reference here?
         """Returns stored function with name ``function_name``
@@ -43,18 +64,28 @@ class Functions:
         KeyError
             If function ``function_name`` does not exist
         """
-        return self.get_all_functions()[function_name]
+        # Look up custom functions first, so they take precedence over built-ins just like in get_all_functions
+        if function_name in self._custom:
+            return self._custom[function_name]
+        return self._builtin[function_name]
+
+    def find_function(self, function_name: str) -> Function | None:
+        """Returns stored function with name ``function_name`` or None if it does not exist (cp. get_function)"""
+        f = self._custom.get(function_name)
+        if f is None:
+            f = self._builtin.get(function_name)
+        return f
 
     def add_function(self, f: CustomFunction) -> str:
         """Stores the user-defined function f and returns the name it was stored under."""
-        function_name = f"f{self._next_id_custom}"
-        self._custom[f"f{self._next_id_custom}"] = f  # NOTE: Should we really store a reference here?
+        function_name = sys.intern(f"f{self._next_id_custom}")  # Makes lookups with the (same) name cheap
+        self._custom[function_name] = f  # NOTE: Should we really store a reference here?
         self._next_id_custom += 1
         return function_name
 
     def replace_builtins(self, builtins: dict[str, BuiltinFunction]) -> None:
         """Updates the map from names to built-in functions with the contents of argument ``builtins``"""
-        self._builtin = copy.deepcopy(builtins)
+        self._builtin = dict(builtins)  # NOTE: Built-in functions are shared (cp. get_builtins)
 
     def delete_function(self, function_name: str) -> None:
         """Deletes the user-defined function ``function_name``
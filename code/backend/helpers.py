@@ -1,7 +1,7 @@
 # https://www.stefaanlippens.net/circular-imports-type-hints-python.html
 from __future__ import annotations
 
-from itertools import groupby
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -14,12 +14,22 @@ import backend.function as function
 ARGUMENT_TYPE_PREFIX = "z"  # Prefix of type variables in argument signature
 FUNCTION_TYPE_PREFIX = "y"  # Prefix of type variables in function signature
 
+# Types of primitive values by their (exact) Python type (cp. infer_value_type)
+PRIMITIVE_VALUE_TYPES: dict[type, Term] = {bool: Bool(), int: Num(), float: Num()}
+
+# Possible results of get_supported_element_types (frozensets are immutable, so the same instances can be returned)
+_SUPPORTED_ANY: frozenset[Term] = frozenset([Num(), Bool()])
+_SUPPORTED_NUM: frozenset[Term] = frozenset([Num()])
+_SUPPORTED_BOOL: frozenset[Term] = frozenset([Bool()])
+_SUPPORTED_NONE: frozenset[Term] = frozenset()
+
 
-# From https://docs.python.org/3/library/itertools.html#itertools-recipes
 def all_equal(iterable) -> bool:
-    """Returns True if all the elements are equal to each other"""
-    g = groupby(iterable)
-    return next(g, True) and not next(g, False)
+    """Returns True if all the elements are equal to each other (stops at the first element which isn't)"""
+    iterator = iter(iterable)
+    for first in iterator:
+        return all(element == first for element in iterator)
+    return True  # No elements
 
 
 def infer_value_type(value: "Value") -> Term:
@@ -37,6 +47,14 @@ def infer_value_type(value: "Value") -> Term:
     - Type of list is determined by its first element. We do not check whether all elements have the same type or
     whether the system actually supports the resulting type of list (e.g. List(List(Num())) might be unsupported)
     """
+    # Fast path for the most common (primitive) values - avoids going through the cases of the match below. Comparing
+    # the exact type also takes care of bool being a subclass of int.
+    value_type = type(value)
+    if value_type is bool:
+        return Bool()
+    if value_type is int or value_type is float:
+        return Num()
+
     match value:
         # Checking for bool needs to happen before checking for int/float, since bool is a subclass of int
         # https://stackoverflow.com/questions/37888620/comparing-boolean-and-int-using-isinstance
@@ -59,15 +77,19 @@ def get_supported_element_types(value: "Value") -> frozenset[Term]:
     Returns set of types of values that can be added to the list `value`.
     Returns empty set if `value` is not a valid list.
     """
-    match infer_value_type(value):
-        case List(Var(_)):
-            return frozenset([Num(), Bool()])
-        case List(Num()):
-            return frozenset([Num()])
-        case List(Bool()):
-            return frozenset([Bool()])
-        case _:
-            return frozenset()
+    # NOTE: Uses isinstance/identity checks instead of match, as this is called whenever a list is created or changes
+    #  its type. Num and Bool are flyweights, so they can be compared by identity.
+    value_type = infer_value_type(value)
+    if not isinstance(value_type, List):
+        return _SUPPORTED_NONE
+    element_type = value_type.a
+    if isinstance(element_type, Var):
+        return _SUPPORTED_ANY
+    if element_type is Num():
+        return _SUPPORTED_NUM
+    if element_type is Bool():
+        return _SUPPORTED_BOOL
+    return _SUPPORTED_NONE
 
 
 def combine_into_app(terms: list[Term]) -> Term:
@@ -84,17 +106,14 @@ def combine_into_app(terms: list[Term]) -> Term:
     ValueError
         If terms is an empty list
     """
-    match terms:
-        case []:
-            raise ValueError(f"Cannot use combine_into_app on an empty list")
-        case [x]:
-            return x
-        case [x, y]:
-            return App(x, y)
-        case [x, *others]:
-            return App(x, combine_into_app(others))
-        case _:
-            assert False, "Pattern matching in combine_into_app failed"
+    if not terms:
+        raise ValueError(f"Cannot use combine_into_app on an empty list")
+
+    # Build the chain from the right (instead of recursing over the rest of the list)
+    result = terms[-1]
+    for term in reversed(terms[:-1]):
+        result = App(term, result)
+    return result
 
 
 def infer_argument_signature(args: list["Value"]) -> Term:
@@ -115,9 +134,17 @@ def infer_argument_signature(args: list["Value"]) -> Term:
     ValueError
         If args is an empty list
     """
-    arg_types: list[Term] = [infer_value_type(arg) for arg in args]
+    # Signatures of primitive arguments only depend on the Python types of the arguments, so they can be cached
+    value_types = tuple(map(type, args))
+    if all(value_type in PRIMITIVE_VALUE_TYPES for value_type in value_types):
+        return _primitive_argument_signature(value_types)
+
+    arg_types: list[Term] = list(map(infer_value_type, args))
     offset = 0
     for i in range(0, len(arg_types)):
+        # Num and Bool don't contain type variables, so alpha conversion would not change them
+        if arg_types[i] is Num() or arg_types[i] is Bool():
+            continue
         arg_types[i], offset = alpha_conversion(arg_types[i], ARGUMENT_TYPE_PREFIX, offset)
 
     # NOTE: Combination should not happen before independent alpha conversion of each term.
@@ -128,19 +155,43 @@ def infer_argument_signature(args: list["Value"]) -> Term:
     return combine_into_app(arg_types)
 
 
+@lru_cache(maxsize=256)
+def _primitive_argument_signature(value_types: tuple[type, ...]) -> Term:
+    """Returns the argument signature of arguments with the (primitive) Python types ``value_types``
+    (cp. infer_argument_signature)
+
+    Raises
+    ------
+    ValueError
+        If value_types is empty
+    """
+    return combine_into_app([PRIMITIVE_VALUE_TYPES[value_type] for value_type in value_types])
+
+
 def decompose_term(t: Term) -> list[Term]:
     """
     Given a term of the form a -> b -> c, decomposes it into the list [a, b, c] (which is then returned).
     """
-    def aux(inner_t: Term, acc: list[Term]) -> list[Term]:
-        match inner_t:
-            case App(a, b):
-                return acc + [a] + decompose_term(b)
-            case Var(_) | Num() | Bool() | List(_):
-                return acc + [inner_t]
-            case _:
-                assert False, f"Pattern matching inside decompose_term failed: received inner_t of type {type(inner_t)}"
-    return aux(t, [])
+    decomposition: list[Term] = []
+    while isinstance(t, App):  # Walk along the chain of App (instead of recursing into the right side)
+        decomposition.append(t.a)
+        t = t.b
+
+    assert isinstance(t, (Var, Num, Bool, List)), \
+        f"Type check inside decompose_term failed: received term of type {type(t)}"
+    decomposition.append(t)
+    return decomposition
+
+
+def takes_single_argument(function_signature: Term) -> bool:
+    """Returns whether a function with signature ``function_signature`` takes exactly one argument
+
+    Notes
+    -----
+    Only then has the type check of a map/filter application already made sure that the function can be applied to
+    each element on its own: Due to currying, (y0 -> y1) also unifies with signatures like Num -> Num -> Num.
+    """
+    return isinstance(function_signature, App) and not isinstance(function_signature.b, App)
 
 
 def drop_last_type_app(t: Term) -> Term:
@@ -1,4 +1,4 @@
-import copy
+import sys
 
 from backend.helper_type import PValue
 from backend.helpers import get_supported_element_types, infer_value_type, all_equal
@@ -21,11 +21,11 @@ def _check_list_type(value: list[PValue]) -> None:
         If `value` has an unsupported list type
     """
     value_type = infer_value_type(value)
-    match value_type:
-        case List(Num()) | List(Bool()) | List(Var(_)):
+    if isinstance(value_type, List):
+        element_type = value_type.a
+        if element_type is Num() or element_type is Bool() or isinstance(element_type, Var):  # Num/Bool are flyweights
             return
-        case _:
-            raise TypeError(f"{value_type} is an unsupported list type")
+    raise TypeError(f"{value_type} is an unsupported list type")
 
 
 def _check_list_elements(value: list[PValue]) -> None:
@@ -38,20 +38,51 @@ def _check_list_elements(value: list[PValue]) -> None:
         If `value` has an unsupported list type or contains elements with different types
     """
     _check_list_type(value)
-    element_types = [infer_value_type(elem) for elem in value]
-    if not all_equal(element_types):
+
+    # Fast path for lists of plain bools or numbers: comparing the exact Python types is enough (ints and floats are
+    # both Num). If the check doesn't pass, we fall back to comparing the inferred types.
+    if value:
+        first_type = type(value[0])
+        if first_type is bool and all(type(elem) is bool for elem in value):
+            return
+        if (first_type is int or first_type is float) and all(type(elem) in (int, float) for elem in value):
+            return
+
+    # map looks up infer_value_type once (not per element), and lazily: types after the first mismatch aren't inferred
+    if not all_equal(map(infer_value_type, value)):
         raise TypeError(f"{value} contains different types of values")
 
 
-def _check_type_add_value(list_value: list[PValue], value: PValue) -> None:
+# Bit flags representing the types that can be added to a list (cp. get_supported_element_types), e.g. an empty list
+# supports _NUM_BIT | _BOOL_BIT
+_NUM_BIT = 1
+_BOOL_BIT = 2
+# Bits of the (exact) Python types of primitive values (cp. infer_value_type)
+_VALUE_TYPE_BITS: dict[type, int] = {bool: _BOOL_BIT, int: _NUM_BIT, float: _NUM_BIT}
+
+
+def _supported_mask(list_value: list[PValue]) -> int:
+    """Returns the bit flags representing the types of values that can be added to list `list_value`"""
+    supported_element_types = get_supported_element_types(list_value)
+    num_bit = _NUM_BIT if Num() in supported_element_types else 0
+    bool_bit = _BOOL_BIT if Bool() in supported_element_types else 0
+    return num_bit | bool_bit
+
+
+def _check_type_add_value(list_value: list[PValue], value: PValue, supported_mask: int) -> None:
     """
-    Check whether value has the correct type to be added to list list_name
+    Check whether value has the correct type to be added to list `list_value`, which supports the types represented by
+    `supported_mask` (cp. _supported_mask)
 
     Raises
     ------
     TypeError
-        If type of `value` is incompatible with types supported by `list_name`
+        If type of `value` is incompatible with types supported by `list_value`
     """
+    if _VALUE_TYPE_BITS.get(type(value), 0) & supported_mask:
+        return
+
+    # Not a primitive value supported by the list: Do the full check (which also generates the error message)
     supported_element_types = get_supported_element_types(list_value)
     value_type = infer_value_type(value)
     if value_type not in supported_element_types:
@@ -64,11 +95,24 @@ class Lists:
 
     def __init__(self):
         self._lists: dict[str, list[PValue]] = {}
+        # Types of values that can be added to each list (cp. _supported_mask). Only changes when a list gets replaced
+        # or becomes (non-)empty, so we don't need to infer it again for every element that is added.
+        self._supported: dict[str, int] = {}
         self._next_id: int = 0
 
     def __str__(self):
         return f"List assignments: {self._lists}, next id: {self._next_id}"
 
+    def __deepcopy__(self, memo: dict) -> "Lists":
+        """Lists only contain primitive (immutable) values (cp. _check_list_elements), so copying each list is enough
+        for a deep copy"""
+        result = Lists()
+        result._lists = {list_name: list(list_value) for list_name, list_value in self._lists.items()}
+        result._supported = dict(self._supported)
+        result._next_id = self._next_id
+        memo[id(self)] = result
+        return result
+
     def create_list(self, value: list[PValue]) -> str:
         """Create new list with entries specified in ``value``. Returns the name of the newly created list.
 
@@ -83,8 +127,11 @@ class Lists:
             If value contains different types of values or unsupported elements
         """
         _check_list_elements(value)
-        list_name: str = f"l{self._next_id}"
-        self._lists[list_name] = copy.deepcopy(value)  # Making sure that sub-objects are not exposed
+        list_name: str = sys.intern(f"l{self._next_id}")  # Makes lookups with the (same) name cheap
+        # Making sure that the passed list is not exposed. A shallow copy is enough, since _check_list_elements makes
+        # sure that the list only contains primitive values (which are immutable)
+        self._lists[list_name] = list(value)
+        self._supported[list_name] = _supported_mask(value)
         self._next_id += 1
         return list_name
 
@@ -100,7 +147,8 @@ class Lists:
         """
         self._check_list_name(list_name)
         _check_list_elements(value)
-        self._lists[list_name] = copy.deepcopy(value)
+        self._lists[list_name] = list(value)  # Shallow copy is enough (cp. create_list)
+        self._supported[list_name] = _supported_mask(value)
 
     # NOTE: Do we really want to return a reference here? Could result in leaking of sub-objects, leading to potentially
     #  unexpected side effects
@@ -144,6 +192,7 @@ class Lists:
         """
         self._check_list_name(list_name)
         del self._lists[list_name]
+        del self._supported[list_name]
 
     def append_to_list(self, list_name: str, value: PValue) -> int:
         """Append element ``value`` to ``list_name``
@@ -160,10 +209,12 @@ class Lists:
         TypeError
             If the type of the passed value is incompatible with the type of the values in list_name
         """
-        self._check_list_name(list_name)
-        _check_type_add_value(self.get_list(list_name), value)
-        self._lists[list_name].append(value)
-        return len(self._lists[list_name]) - 1
+        list_value = self._get_existing_list(list_name)
+        _check_type_add_value(list_value, value, self._supported[list_name])
+        list_value.append(value)
+        if len(list_value) == 1:  # List was empty before, so its type is now determined by value
+            self._supported[list_name] = _supported_mask(list_value)
+        return len(list_value) - 1
 
     def insert_list_element(self, list_name: str, value: PValue, index: int) -> None:
         """Insert element ``value`` at position ``index`` into ``list_name``
@@ -175,9 +226,11 @@ class Lists:
         TypeError
             If the type of the passed value is incompatible with the type of the values in list_name
         """
-        self._check_list_name(list_name)
-        _check_type_add_value(self.get_list(list_name), value)
-        self._lists[list_name].insert(index, value)
+        list_value = self._get_existing_list(list_name)
+        _check_type_add_value(list_value, value, self._supported[list_name])
+        list_value.insert(index, value)
+        if len(list_value) == 1:  # List was empty before, so its type is now determined by value
+            self._supported[list_name] = _supported_mask(list_value)
 
     def update_list_element(self, list_name: str, value: PValue, index: int) -> None:
         """Update element at position ``index`` in ``list_name`` to ``value``
@@ -191,12 +244,17 @@ class Lists:
         IndexError
             If index is invalid for list_name
         """
-        self._check_list_name(list_name)
-        list_value = self.get_list(list_name)
+        list_value = self._get_existing_list(list_name)
         # Value to be updated should not be considered when determining the type of the list. This allows us to update
         # a singleton list: [True] -> [0]
-        _check_type_add_value(list_value[:index] + list_value[index+1:], value)
-        self._lists[list_name][index] = value
+        # NOTE: If the list has at least two elements, the remaining elements are never empty and have the same type as
+        #  the whole list. Thus, we only need to build the remaining elements for short lists (or to report an error).
+        if len(list_value) < 2 or not _VALUE_TYPE_BITS.get(type(value), 0) & self._supported[list_name]:
+            remaining = list_value[:index] + list_value[index+1:]
+            _check_type_add_value(remaining, value, _supported_mask(remaining))
+        list_value[index] = value
+        if len(list_value) == 1:  # Type of singleton list is determined by the new value
+            self._supported[list_name] = _supported_mask(list_value)
 
     def delete_list_element(self, list_name: str, index: int) -> None:
         """Delete element at position ``index`` in ``list_name``
@@ -208,8 +266,10 @@ class Lists:
         IndexError
             If index is invalid for list_name
         """
-        self._check_list_name(list_name)
-        self._lists[list_name].pop(index)
+        list_value = self._get_existing_list(list_name)
+        list_value.pop(index)
+        if not list_value:  # Any supported type can be added to an empty list
+            self._supported[list_name] = _supported_mask(list_value)
 
     def _check_list_name(self, list_name: str) -> None:
         """Checks whether ``list_name`` exists
@@ -221,3 +281,17 @@ class Lists:
         """
         if list_name not in self._lists:
             raise ValueError(f"{list_name} does not exist")
+
+    def _get_existing_list(self, list_name: str) -> list[PValue]:
+        """Returns list ``list_name`` if it exists. Same as _check_list_name followed by a lookup of the list, but only
+        needs a single lookup.
+
+        Raises
+        ------
+        ValueError
+            If list_name is invalid, i.e. list with name list_name does not exist
+        """
+        list_value = self._lists.get(list_name)
+        if list_value is None:
+            raise ValueError(f"{list_name} does not exist")
+        return list_value
@@ -1,3 +1,5 @@
+import sys
+
 from backend.helper_type import PValue
 from backend.helpers import infer_value_type
 from backend.unify import Num, Bool
@@ -17,11 +19,9 @@ def _check_value_type(value: PValue) -> None:
     ``AssertionError``
     """
     value_type = infer_value_type(value)
-    match value_type:
-        case Num() | Bool():
-            return
-        case _:
-            raise TypeError(f"{value_type} is an unsupported register type")
+    if value_type is Num() or value_type is Bool():  # Num and Bool are flyweights
+        return
+    raise TypeError(f"{value_type} is an unsupported register type")
 
 
 class Registers:
@@ -34,6 +34,14 @@ class Registers:
     def __str__(self):
         return f"Register assignments: {self._registers}, next id: {self._next_id}"
 
+    def __deepcopy__(self, memo: dict) -> "Registers":
+        """Registers only contain primitive (immutable) values, so copying the mapping is enough for a deep copy"""
+        result = Registers()
+        result._registers = dict(self._registers)
+        result._next_id = self._next_id
+        memo[id(self)] = result
+        return result
+
     def is_valid_register(self, register: str) -> bool:
         """Returns whether ``register`` is a valid register."""
         return register in self._registers
@@ -52,7 +60,7 @@ class Registers:
             If type of `value` is unsupported (i.e. not Num or Bool)
         """
         _check_value_type(value)
-        register_name = f"r{self._next_id}"
+        register_name = sys.intern(f"r{self._next_id}")  # Makes lookups with the (same) name cheap
         self._registers[register_name] = value
         self._next_id += 1
         return register_name
@@ -1,8 +1,13 @@
 import copy
+import logging
+import sys
+from typing import Hashable
 
 from backend.builtin_function import BuiltinFunction
+from backend.custom_function import CustomFunction
 from backend.demonstration import Demonstration
 from backend.exceptions import ModeError, NoneAsFunArg, AlgotRuntimeError
+from backend.function import Function
 from backend.functions import Functions
 from backend.helper_type import PValue, Value, Path
 from backend.lists import Lists
@@ -12,10 +17,19 @@ from backend.helpers import infer_value_type
 
 from backend.unify import Num, Bool, List
 
+logger = logging.getLogger(__name__)
+
 # Integer representation of different modes
 BETWEEN = -1  # Mode to interact with state in between examples
 INTERACTIVE = 0  # Mode to interact with state without restrictions
 DEMONSTRATION = 1  # Mode during function synthesis
+_MODE_NAMES = {BETWEEN: "BETWEEN", INTERACTIVE: "INTERACTIVE", DEMONSTRATION: "DEMONSTRATION"}  # cp. current_mode
+# NOTE: The mode of a state is only ever changed by the _set_* methods (to one of the modes above), so methods don't
+#  need to handle invalid modes
+
+# Modes in which a name cannot be deleted/changed while it's still used in the current demonstration (cp. _check_unused)
+_PROTECTED_DELETE_MODES = frozenset([DEMONSTRATION, BETWEEN])
+_PROTECTED_CHANGE_MODES = frozenset([DEMONSTRATION])
 
 # NOTE: If a comment contains "backend" without it making sense, it could be that it should actually be "refactor"
 #  instead (caused by renaming the package from refactor to backend)
@@ -27,6 +41,34 @@ DEMONSTRATION = 1  # Mode during function synthesis
 # TODO: Deal with the cases where we have function calls which are different, but equivalent to public functions we
 #  have (e.g. private get_value vs public get_value)
 
+# Built-ins are the same for every state except for their unique id, so we only construct them once and give each state
+# copies with fresh unique ids (cp. BuiltinFunction.with_unique_id). The prototypes themselves are never exposed.
+_BUILTIN_PROTOTYPES: dict[str, BuiltinFunction] = {name: BuiltinFunction(name, signature, -1)
+                                                   for name, signature in BuiltinFunction.supported_operations.items()}
+
+# Maximum number of results of custom function applications that are cached per state (cp. _get_apply_result)
+_APPLY_CACHE_SIZE = 128
+
+
+def _fingerprint(value: Value | None) -> Hashable:
+    """Returns a hashable key which identifies ``value`` for caching function applications
+
+    Notes
+    -----
+    The type is part of the key, since equal values of different types can lead to different results (or errors), e.g.
+    1 == True. Floats are represented by their hex representation to tell apart 0.0 and -0.0. Functions are identified
+    by their unique id.
+    """
+    value_type = type(value)
+    if value_type is list:
+        return list, tuple(map(_fingerprint, value))
+    if value_type is float:
+        return float, value.hex()
+    if isinstance(value, Function):
+        return Function, value.unique_id
+    return value_type, value
+
+
 # Type for taking a snapshot of the state attribute. Snapshots are used to make sure we don't end up in an inconsistent
 # state
 StateSnap = tuple[Registers, Lists, Functions, Demonstration | None, int, list[tuple[str, bool]], int]
@@ -35,6 +77,10 @@ StateSnap = tuple[Registers, Lists, Functions, Demonstration | None, int, list[t
 class State:
     """State required for the backend implementation"""
 
+    # Avoids a per-instance dict (all attributes are set in __init__)
+    __slots__ = ("_registers", "_lists", "_functions", "_current_demonstration", "_mode", "_selected", "_unique_id",
+                 "_apply_cache")
+
     def __init__(self):
         # NOTE: If we add any attributes, make sure to add it to _state_copy and state_restore
         # TODO: Make "If we add any attributes, make sure to add it to _state_copy and state_restore" irrelevant by
@@ -47,11 +93,14 @@ class State:
         self._mode: int = 0
         self._selected: list[tuple[str, bool]] = []  # [(name, is_variable), ...]
         self._unique_id = 0
+        # Results of applying custom functions, by unique id of the function and fingerprints of the arguments
+        # (cp. _get_apply_result)
+        self._apply_cache: dict[tuple[int, tuple[Hashable, ...]], Value] = {}
 
         # Initialize built-in functions
         result: dict[str, BuiltinFunction] = {}
-        for name, signature in BuiltinFunction.supported_operations.items():
-            result[name] = BuiltinFunction(name, signature, self._get_unique_id())
+        for name, prototype in _BUILTIN_PROTOTYPES.items():
+            result[name] = prototype.with_unique_id(self._get_unique_id())
 
         self._functions.replace_builtins(result)
 
@@ -64,6 +113,22 @@ class State:
                 f"Mode: {self.current_mode()}\n"
                 f"Selected: {self._selected}\n")
 
+    def __deepcopy__(self, memo: dict) -> "State":
+        """Returns a deep copy of the state, which starts out with an empty cache of function applications
+
+        Notes
+        -----
+        Snapshots (cp. Snapper) deep copy the whole state. Cached results (cp. _get_apply_result) can always be computed
+        again, so copying them would only make every snapshot larger and more expensive.
+        """
+        result = State.__new__(State)
+        memo[id(self)] = result
+        for attribute in State.__slots__:
+            if attribute != "_apply_cache":
+                setattr(result, attribute, copy.deepcopy(getattr(self, attribute), memo))
+        result._apply_cache = {}
+        return result
+
     # "Public" methods
     def get_builtins(self) -> dict[str, BuiltinFunction]:
         """Return map from names to built-in functions supported by the system"""
@@ -79,22 +144,16 @@ class State:
         """
         # TODO: It might be a good idea to make sure that we don't accidentally return sub objects instead of copies of
         #  them (otherwise there is the risk of unexpected side-effects)
-        try:
+        # NOTE: Checking for membership first avoids raising (and catching) a KeyError for every kind of name that
+        #  doesn't match, which is the common case for everything but registers
+        if self._registers.is_valid_register(name):
             return self._registers.get_register(name)
-        except KeyError:
-            pass
-        try:
+        if self._lists.is_valid_list(name):
             return self._lists.get_list(name)
-        except KeyError:
-            pass
-        try:
+        if self._functions.is_valid_function(name):
             return self._functions.get_function(name)
-        except KeyError:
-            pass
-        try:
+        if self._current_demonstration is not None and self._current_demonstration.is_valid_temp(name):
             return self._current_demonstration.get_temp(name)
-        except KeyError:
-            pass
         raise ValueError(f"Could not find {name}")
 
     def get_computation(self, name: str) -> list[str]:
@@ -125,19 +184,24 @@ class State:
 
     def current_mode(self) -> str:
         """Returns the name of the current mode as a string"""
-        if self.is_interactive():
-            return "INTERACTIVE"
-        elif self.is_demonstration():
-            return "DEMONSTRATION"
-        elif self.is_between():
-            return "BETWEEN"
-        else:
-            return "INVALID"
+        return _MODE_NAMES.get(self._mode, "INVALID")
 
     # Selected
     def get_selected(self) -> list[tuple[str, bool]]:
         """Returns a copy of the list of currently selected names"""
-        return copy.deepcopy(self._selected)
+        # Shallow copy is enough, since the (str, bool) tuples are immutable
+        return list(self._selected)
+
+    def get_selected_at(self, index: int) -> tuple[str, bool]:
+        """Returns the selected name at position ``index`` (cp. get_selected). Cheaper than get_selected()[index], since
+        the list of selected names doesn't need to be copied.
+
+        Raises
+        ------
+        IndexError
+            If index is out-of-bounds
+        """
+        return self._selected[index]  # Tuple is immutable, so it can be returned directly
 
     # Registers
     def create_register(self, value: PValue = 0) -> str:
@@ -166,16 +230,9 @@ class State:
         [Demonstration/Between mode] ValueError
             If register is still in use
         """
-        if self.is_interactive():
-            self._registers.delete_register(register)
-            self._delete_selected(register)
-        elif self.is_demonstration() or self.is_between():
-            if self._is_used(register):
-                raise ValueError(f"Cannot delete {register}, as it is still used")
-            self._registers.delete_register(register)
-            self._delete_selected(register)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(register, _PROTECTED_DELETE_MODES, "Cannot delete {}, as it is still used")
+        self._registers.delete_register(register)
+        self._delete_selected(register)
 
     def update_register(self, register: str, value: PValue) -> None:
         """Update ``register`` with value ``value``
@@ -193,14 +250,8 @@ class State:
         [Demonstration mode]
             If register is still in use
         """
-        if self.is_interactive() or self.is_between():
-            self._registers.update_register(register, value)
-        elif self.is_demonstration():
-            if self._is_used(register):
-                raise ValueError(f"Cannot update {register}, as it is still used")
-            self._registers.update_register(register, value)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(register, _PROTECTED_CHANGE_MODES, "Cannot update {}, as it is still used")
+        self._registers.update_register(register, value)
 
     def get_register(self, register_name: str) -> PValue:
         """Returns the value of the register ``register_name``
@@ -281,11 +332,8 @@ class State:
         [Demonstration mode] ValueError
             If list is still in use
         """
-        if self.is_interactive() or self.is_between():
-            self._lists.update_list(list_name, value)
-        elif self.is_demonstration():
-            if self._is_used(list_name):
-                raise ValueError(f"Cannot update {list_name}, as it is still used")
+        self._check_unused(list_name, _PROTECTED_CHANGE_MODES, "Cannot update {}, as it is still used")
+        self._lists.update_list(list_name, value)
 
     def delete_list(self, list_name: str) -> None:
         """Delete list ``list_name``
@@ -303,16 +351,9 @@ class State:
         [Demonstration/Between mode] ValueError
             If list is still in use
         """
-        if self.is_interactive():
-            self._lists.delete_list(list_name)
-            self._delete_selected(list_name)
-        elif self.is_demonstration() or self.is_between():
-            if self._is_used(list_name):
-                raise ValueError(f"Cannot delete {list_name}, since it is still used")
-            self._lists.delete_list(list_name)
-            self._delete_selected(list_name)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(list_name, _PROTECTED_DELETE_MODES, "Cannot delete {}, since it is still used")
+        self._lists.delete_list(list_name)
+        self._delete_selected(list_name)
 
     def append_to_list(self, list_name: str, value: PValue = 0) -> int:
         """Append element ``value`` to ``list_name``
@@ -335,14 +376,8 @@ class State:
         [Demonstration mode] ValueError
             If list is still in use
         """
-        if self.is_interactive() or self.is_between():
-            return self._lists.append_to_list(list_name, value)
-        elif self.is_demonstration():
-            if self._is_used(list_name):
-                raise ValueError(f"Cannot change {list_name}, since it is still used")
-            return self._lists.append_to_list(list_name, value)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(list_name, _PROTECTED_CHANGE_MODES, "Cannot change {}, since it is still used")
+        return self._lists.append_to_list(list_name, value)
 
     def insert_list_element(self, list_name: str, value: PValue, index: int) -> None:
         """Insert element ``value`` at position ``index`` into ``list_name``
@@ -360,14 +395,8 @@ class State:
         [Demonstration mode] ValueError
             If list is still in use
         """
-        if self.is_interactive() or self.is_between():
-            self._lists.insert_list_element(list_name, value, index)
-        elif self.is_demonstration():
-            if self._is_used(list_name):
-                raise ValueError(f"Cannot change {list_name}, since it is still used")
-            self._lists.insert_list_element(list_name, value, index)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(list_name, _PROTECTED_CHANGE_MODES, "Cannot change {}, since it is still used")
+        self._lists.insert_list_element(list_name, value, index)
 
     def update_list_element(self, list_name: str, value: PValue, index: int) -> None:
         """Update element at position ``index`` in ``list_name`` to ``value``
@@ -387,14 +416,8 @@ class State:
         [Demonstration mode] ValueError
             If list is still in use
         """
-        if self.is_interactive() or self.is_between():
-            self._lists.update_list_element(list_name, value, index)
-        elif self.is_demonstration():
-            if self._is_used(list_name):
-                raise ValueError(f"Cannot change {list_name}, since it is still used")
-            self._lists.update_list_element(list_name, value, index)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(list_name, _PROTECTED_CHANGE_MODES, "Cannot change {}, since it is still used")
+        self._lists.update_list_element(list_name, value, index)
 
     def delete_list_element(self, list_name: str, index: int) -> None:
         """Delete element at position ``index`` in ``list_name``
@@ -412,14 +435,8 @@ class State:
         [Demonstration mode] ValueError
             If list is still in use
         """
-        if self.is_interactive() or self.is_between():
-            self._lists.delete_list_element(list_name, index)
-        elif self.is_demonstration():
-            if self._is_used(list_name):
-                raise ValueError(f"Cannot change {list_name}, since it is still used")
-            self._lists.delete_list_element(list_name, index)
-        else:
-            assert False, f"Invalid mode {self._mode}"
+        self._check_unused(list_name, _PROTECTED_CHANGE_MODES, "Cannot change {}, since it is still used")
+        self._lists.delete_list_element(list_name, index)
 
     def is_valid_list(self, list_name: str) -> bool:
         """Returns whether a list with the name ``list_name`` actually exists"""
@@ -438,13 +455,12 @@ class State:
         ValueError
             If state is in demonstration or between mode.
         """
-        if self.is_interactive():
+        mode = self._mode
+        if mode == INTERACTIVE:
             self._set_demonstration()
             self._current_demonstration = Demonstration()
-        elif self.is_demonstration() or self.is_between():
+        elif mode == DEMONSTRATION or mode == BETWEEN:
             raise ValueError("Cannot create a new function in demonstration/between mode")
-        else:
-            assert False, f"Invalid mode {self._mode}"
 
     def delete_function(self, function_name: str) -> None:
         """Deletes the user-defined function ``function_name``
@@ -456,12 +472,11 @@ class State:
         [Demonstration/Between mode] ValueError
             If state is in demonstration or between mode
         """
-        if self.is_interactive():
+        mode = self._mode
+        if mode == INTERACTIVE:
             self._functions.delete_function(function_name)
-        elif self.is_demonstration() or self.is_between():
+        elif mode == DEMONSTRATION or mode == BETWEEN:
             raise ValueError("Cannot delete function in demonstration/between mode")  # TODO: Why not?
-        else:
-            assert False, f"Invalid mode {self._mode}"
 
     # Interaction/Demonstration
     def select(self, identifier: str, is_variable: bool) -> int:
@@ -472,13 +487,13 @@ class State:
         int
             Position of selected name in self._selected list
         """
-        match self.current_mode():
-            case "INTERACTIVE" | "BETWEEN":
-                return self._select_interactive_between(identifier)
-            case "DEMONSTRATION":
-                return self._select_demonstration(identifier, is_variable)
-            case _:
-                assert False, "Invalid mode"
+        # Selected names are looked up repeatedly (e.g. get_value), which is cheaper with the state's interned names
+        identifier = sys.intern(identifier)
+        mode = self._mode
+        if mode == INTERACTIVE or mode == BETWEEN:
+            return self._select_interactive_between(identifier)
+        elif mode == DEMONSTRATION:
+            return self._select_demonstration(identifier, is_variable)
 
     def unselect(self, idx: int) -> None:
         """Removes element at position `idx` in the selected list
@@ -492,7 +507,7 @@ class State:
 
     def unselect_all(self) -> None:
         """Unselects all elements"""
-        self._selected = []
+        self._selected.clear()  # Never exposed (cp. get_selected), so it can be cleared in place
 
     def apply(self, function_name: str, is_variable: bool) -> str:
         """Represents applying ``function_name`` to the currently selected elements in the context of function synthesis
@@ -522,18 +537,21 @@ class State:
         [Demonstration] ValueError
             If the generated instruction does not match the expected instruction
         """
-        state_snap = self._state_copy()
+        # Interactive/between mode only stores the result in a new register/list, demonstration mode only changes the
+        # current demonstration
+        mode = self._mode
+        if mode == DEMONSTRATION:
+            state_snap = self._state_copy(copy_storage=False, copy_functions=False)
+        else:
+            state_snap = self._state_copy(copy_functions=False, copy_demonstration=False)
         try:
-            match self.current_mode():
-                case "INTERACTIVE" | "BETWEEN":
-                    return self._apply_interactive_between(function_name)
-                case "DEMONSTRATION":
-                    return self._apply_demonstration(function_name, is_variable)
-                case _:
-                    assert False, "Invalid mode"
+            if mode == INTERACTIVE or mode == BETWEEN:
+                return self._apply_interactive_between(function_name)
+            elif mode == DEMONSTRATION:
+                return self._apply_demonstration(function_name, is_variable)
         except Exception as e:  # https://stackoverflow.com/a/4992124
             # NOTE: This is probably too coarse grained, but will probably work. Consider making it more fine-grained.
-            print(f"Encountered error {e}. Restoring snapshot.")
+            logger.debug("Encountered error %s. Restoring snapshot.", e)
             self._state_restore(state_snap)
             raise e
 
@@ -563,12 +581,14 @@ class State:
             If next instruction doesn't exist, even though it is not a recursive application
         """
         self._check_demonstration()
-        state_snap = self._state_copy()  # Create a snapshot that we can restore in case something goes wrong
+        # Create a snapshot that we can restore in case something goes wrong (only the demonstration is changed)
+        state_snap = self._state_copy(copy_storage=False, copy_functions=False)
         try:
             # TODO: Think about whether we should first calculate expr or result
             # NOTE: Pulled expr assignment before result for testing
-            expr = ["self"] + self._add_to_function_context(self._selected)
-            result: Value | None = self._get_apply_result("self")
+            args = self._get_selected_values()
+            expr = ["self"] + self._add_to_function_context(self._selected, args)
+            result: Value | None = self._get_apply_result("self", args)
 
             temp_name = self._current_demonstration.add_recursive_application(expr, result)
 
@@ -576,7 +596,7 @@ class State:
             return temp_name
         except Exception as e:  # https://stackoverflow.com/a/4992124
             # NOTE: This is probably too coarse grained, but will probably work. Consider making it more fine-grained.
-            print(f"Encountered error {e}. Restoring snapshot.")
+            logger.debug("Encountered error %s. Restoring snapshot.", e)
             self._state_restore(state_snap)
             raise e
 
@@ -595,7 +615,7 @@ class State:
             If selected element is not of type Bool
         """
         self._check_demonstration()
-        state_snap = self._state_copy()
+        state_snap = self._state_copy(copy_storage=False, copy_functions=False)  # Only the demonstration is changed
         try:
             if len(self._selected) != 1:
                 raise ValueError(f"Expected exactly one element to be selected. Number of selected elements: "
@@ -609,13 +629,14 @@ class State:
             if selected_type != Bool():
                 raise TypeError(f"Expected {self._selected[0]} to be of type Bool(), and not {selected_type}")
 
-            cond_name = self._add_to_function_context(self._selected)[0]  # needed if we want to branch on an input
+            # Needed if we want to branch on an input
+            cond_name = self._add_to_function_context(self._selected, [cond_value])[0]
 
             self._current_demonstration.branch(cond_name, cond_value)
             self.unselect_all()
         except Exception as e:  # https://stackoverflow.com/a/4992124
             # NOTE: This is probably too coarse grained, but will probably work. Consider making it more fine-grained.
-            print(f"Encountered error {e}. Restoring snapshot.")
+            logger.debug("Encountered error %s. Restoring snapshot.", e)
             self._state_restore(state_snap)
             raise e
 
@@ -641,7 +662,7 @@ class State:
             If unification during function generation failed
         """
         self._check_demonstration()
-        state_snap = self._state_copy()
+        state_snap = self._state_copy(copy_storage=False)  # Registers and lists are not changed
         try:
             if len(self._selected) != 1:
                 raise ValueError(f"Expected exactly one element to be selected. Number of selected elements: "
@@ -668,7 +689,7 @@ class State:
             return remaining_examples, function_name
         except Exception as e:  # https://stackoverflow.com/a/4992124
             # NOTE: This is probably too coarse grained, but will probably work. Consider making it more fine-grained.
-            print(f"Encountered error {e}. Restoring snapshot.")
+            logger.debug("Encountered error %s. Restoring snapshot.", e)
             self._state_restore(state_snap)
             raise e
 
@@ -686,7 +707,7 @@ class State:
 
     def is_valid_temporary(self, temp_name: str) -> bool:
         """Returns whether ``temp_name`` is the name of a temporary"""
-        return self.is_demonstration() and self._current_demonstration.is_valid_temp(temp_name)
+        return self._mode == DEMONSTRATION and self._current_demonstration.is_valid_temp(temp_name)
 
     def get_temp_names(self) -> list[str]:
         """Return a list with the names of all temporaries"""
@@ -788,7 +809,7 @@ class State:
             Value is a list and contains different types of values or unsupported elements
         """
         self._check_interactive_between()
-        result = self._get_apply_result(function_name)
+        result = self._get_apply_result(function_name, self._get_selected_values())
         identifier = self._store_value(result)
         self.unselect_all()
         return identifier
@@ -824,13 +845,12 @@ class State:
             If next instruction doesn't exist, even though it is not a recursive application
         """
         self._check_demonstration()
-        result: Value = self._get_apply_result(function_name)  # Also functions as type checking
+        args = self._get_selected_values()
+        result: Value = self._get_apply_result(function_name, args)  # Also functions as type checking
 
-        # OPT: Maybe we can rewrite this to be a bit cleaner
-        expr = self._add_to_function_context(self._selected + [(function_name, is_variable)])  # Function is added last
-        # In expression, function is first, thus we need to shift the last element to the first position:
-        # Method 2: https://www.geeksforgeeks.org/python-shift-last-element-to-first-position-in-list/
-        expr.insert(0, expr.pop())
+        # In expression, function is first. However, it needs to be added to the function context last.
+        arg_names = self._add_to_function_context(self._selected, args)
+        expr = self._add_to_function_context([(function_name, is_variable)]) + arg_names
 
         identifier = self._current_demonstration.add_function_application(expr, result)
 
@@ -845,7 +865,7 @@ class State:
         ModeError
             If current mode is not interactive mode
         """
-        if not self.is_interactive():
+        if self._mode != INTERACTIVE:
             raise ModeError("Check for being in interactive mode failed")
 
     def _check_demonstration(self) -> None:
@@ -856,7 +876,7 @@ class State:
         ModeError
             If current mode is not demonstration mode
         """
-        if not self.is_demonstration():
+        if self._mode != DEMONSTRATION:
             raise ModeError("Check for being in demonstration mode failed")
 
     def _check_between(self) -> None:
@@ -867,7 +887,7 @@ class State:
         ModeError
             If current mode is not between mode
         """
-        if not self.is_between():
+        if self._mode != BETWEEN:
             raise ModeError("Check for being in between mode failed")
 
     def _check_interactive_between(self) -> None:
@@ -878,7 +898,7 @@ class State:
         ModeError
             If current mode is neither interactive nor between mode
         """
-        if not (self.is_interactive() or self.is_between()):
+        if self._mode != INTERACTIVE and self._mode != BETWEEN:
             raise ModeError("Check for being in interactive or between mode failed")
 
     def _set_interactive(self) -> None:
@@ -898,7 +918,7 @@ class State:
         return (self._registers.is_valid_register(name) or
                 self._lists.is_valid_list(name) or  # TODO We have equivalent public methods; Why not use those instead?
                 self._functions.is_valid_function(name) or
-                (self.is_demonstration() and self._current_demonstration.is_valid_name(name)))
+                (self._mode == DEMONSTRATION and self._current_demonstration.is_valid_name(name)))
 
     def _is_used(self, name: str) -> bool:
         """Returns whether ``name`` is used as an input
@@ -911,6 +931,18 @@ class State:
         self._check_demonstration()
         return self._current_demonstration.is_used(name)
 
+    def _check_unused(self, name: str, protected_modes: frozenset[int], error_message: str) -> None:
+        """Checks whether ``name`` can be deleted/changed, i.e. that it is not in use if the current mode is one of
+        ``protected_modes``
+
+        Raises
+        ------
+        ValueError
+            If name is still in use (``error_message`` is formatted with name)
+        """
+        if self._mode in protected_modes and self._is_used(name):
+            raise ValueError(error_message.format(name))
+
     def _get_values(self, names: list[str]) -> list[Value]:
         """Returns the values of the names in ``names``
 
@@ -921,6 +953,16 @@ class State:
         """
         return [self.get_value(name) for name in names]
 
+    def _get_selected_values(self) -> list[Value]:
+        """Returns the values of the currently selected names
+
+        Raises
+        ------
+        ValueError
+            If a name could not be found
+        """
+        return self._get_values([name for name, _ in self._selected])
+
     def _store_value(self, value: Value) -> str:  # in interactive state
         """Stores ``value`` in state.
 
@@ -936,20 +978,18 @@ class State:
             Value is a list and contains different types of values or unsupported elements
         """
         value_type = infer_value_type(value)
-        match value_type:
-            case Num() | Bool():
-                return self.create_register(value)
-            case List(_):
-                return self.create_list(value)
-            case _:
-                assert False, "Trying to store something besides Num, Bool, List should not be possible"
+        if value_type is Num() or value_type is Bool():  # Num and Bool are flyweights
+            return self.create_register(value)
+        if isinstance(value_type, List):
+            return self.create_list(value)
+        assert False, "Trying to store something besides Num, Bool, List should not be possible"
 
     def _delete_selected(self, name: str) -> None:
         """Remove ``name`` from self._selected"""
         self._selected = [item for item in self._selected if item[0] != name]
 
-    def _get_apply_result(self, function_name: str) -> Value | None:
-        """Applies `function_name` to selected objects and returns the result.
+    def _get_apply_result(self, function_name: str, args: list[Value]) -> Value | None:
+        """Applies `function_name` to ``args`` (the values of the selected objects) and returns the result.
 
         Raises
         ------
@@ -965,36 +1005,53 @@ class State:
         IndexError
             If next instruction doesn't exist, even though it is not a recursive application
         """
-        try:  # Get function
-            if function_name == "self":
-                f = self._current_demonstration.generate_function(self._get_unique_id())
-            else:
-                f = self._functions.get_function(function_name)
-        except KeyError:
-            raise ValueError(f"Could not find function {function_name}")
+        is_recursive = function_name == "self"  # Recursive application in the current demonstration
+        if is_recursive:
+            f = self._current_demonstration.generate_function(self._get_unique_id())
+        else:
+            f = self._functions.find_function(function_name)
+            if f is None:
+                raise ValueError(f"Could not find function {function_name}")
+
+        # Custom functions are pure, but (especially if they are recursive) can be expensive to compute. Thus, we cache
+        # their results. Built-ins are cheap enough that computing the key would cost about as much as the result.
+        cache_key = None
+        if not is_recursive and isinstance(f, CustomFunction):
+            cache_key = (f.unique_id, tuple(map(_fingerprint, args)))
+            cached = self._apply_cache.get(cache_key)
+            if cached is not None:
+                return list(cached) if type(cached) is list else cached  # Cached lists must not be shared
 
         try:  # Apply function
-            selected_names = [name for name, _ in self._selected]
-            result = f.compute(self._get_values(selected_names))
+            result = f.compute(args)
         except (TypeError, AlgotRuntimeError) as e:
             raise ValueError(e)
         except IndexError as e:  # Could not finish f.compute
-            if function_name == "self":  # Could not finish recursive call due to missing instructions
+            if is_recursive:  # Could not finish recursive call due to missing instructions
                 return None
             else:
                 raise e
         except NoneAsFunArg:  # If a function receives None as argument, it returns None itself
             return None
 
+        if cache_key is not None:
+            if len(self._apply_cache) >= _APPLY_CACHE_SIZE:
+                self._apply_cache.clear()
+            self._apply_cache[cache_key] = list(result) if type(result) is list else result
         return result
 
-    def _add_to_function_context(self, names: list[tuple[str, bool]]) -> list[str]:
+    def _add_to_function_context(self, names: list[tuple[str, bool]], values: list[Value] | None = None) -> list[str]:
         """Given a list of names + whether they are a variable (``names``), adds the entries to the function context and
         returns a list of the corresponding names in the function context
+
+        Notes
+        -----
+        If the values of the names have already been looked up, they can be passed as ``values`` (in the same order as
+        names), so constants don't need to be looked up again.
         """
         context_name = []
 
-        for name, is_variable in names:
+        for i, (name, is_variable) in enumerate(names):
             if self._current_demonstration.is_valid_temp(name):
                 context_name.append(name)
                 continue
@@ -1003,7 +1060,7 @@ class State:
                 input_name = self._current_demonstration.add_input(name)
                 context_name.append(input_name)
             else:
-                value = self.get_value(name)
+                value = self.get_value(name) if values is None else values[i]
                 const_name = self._current_demonstration.add_constant(value)
                 context_name.append(const_name)
 
@@ -1011,13 +1068,35 @@ class State:
 
     # TODO: Maybe rewrite _state_copy and _state_restore by accessing all the instance attributes of an object
     #  (Notion of instance attributes: https://dzone.com/articles/python-class-attributes-vs-instance-attributes)
-    def _state_copy(self) -> StateSnap:
-        """Return tuple with a copy of all of State's attributes"""
-        state_tuple = (self._registers, self._lists, self._functions, self._current_demonstration, self._mode,
-                       self._selected, self._unique_id)
-        return copy.deepcopy(state_tuple)
+    def _state_copy(self, copy_storage: bool = True, copy_functions: bool = True,
+                    copy_demonstration: bool = True) -> StateSnap:
+        """Return tuple with a copy of all of State's attributes
+
+        Notes
+        -----
+        Copying the whole state is by far the most expensive part of apply/recurse/branch/ret, even though the snapshot
+        is thrown away if nothing goes wrong. Thus, the caller can choose to not copy the registers and lists
+        (``copy_storage``), the functions (``copy_functions``) or the current demonstration (``copy_demonstration``) if
+        the operation doesn't mutate them. These attributes are stored by reference instead.
+        The remaining attributes are either immutable (mode, unique_id) or only contain immutable values (selected), so
+        a shallow copy of them is enough.
+        """
+        memo = {}  # Shared between the copies, so objects referenced by several attributes are only copied once
+        registers = copy.deepcopy(self._registers, memo) if copy_storage else self._registers
+        lists = copy.deepcopy(self._lists, memo) if copy_storage else self._lists
+        functions = copy.deepcopy(self._functions, memo) if copy_functions else self._functions
+        if copy_demonstration:
+            current_demonstration = copy.deepcopy(self._current_demonstration, memo)
+        else:
+            current_demonstration = self._current_demonstration
+        return (registers, lists, functions, current_demonstration, self._mode, list(self._selected), self._unique_id)
 
     def _state_restore(self, state_snap: StateSnap) -> None:
         """Update current attributes with passed snapshot ``state_snap``"""
+        unique_id = self._unique_id
         (self._registers, self._lists, self._functions, self._current_demonstration, self._mode, self._selected,
          self._unique_id) = state_snap
+        # Unique ids handed out since the snapshot will be handed out again, so cached results might not belong to the
+        # same function anymore
+        if self._unique_id != unique_id:
+            self._apply_cache.clear()
@@ -455,4 +455,196 @@ def test_cond_map() -> State:
     print(s)
     return s
 
+def test_map_filter_arity() -> State:
+    """Test whether map/filter reject functions taking more than one argument (which unify with (y0 -> y1) due to
+    currying) with the same error as before, both for custom functions and built-ins"""
+    s = State()
+
+    # Create function f0(a, b) = a + b
+    s.create_function()
+    s.create_register(1)  # r0
+    s.create_register(2)  # r1
+    s._select_demonstration("r0", True)
+    s._select_demonstration("r1", True)
+    s._apply_demonstration("+", False)  # temp0 = r0 + r1
+    s._select_demonstration("temp0", True)
+    s.ret()  # f0
+
+    s.create_list([1, 2, 3])  # l0
+    for function_name in ("f0", "+"):
+        for builtin in ("map", "filter"):
+            s._select_interactive_between(function_name)
+            s._select_interactive_between("l0")
+            try:
+                s._apply_interactive_between(builtin)
+            except ValueError as e:
+                assert str(e).startswith("Unification failed"), e
+            else:
+                assert False, f"{builtin} {function_name} l0 should fail"
+            s.unselect_all()  # Selected elements are kept if the application fails
+    print(s)
+    return s
+
+
+def test_head_of_map_errors() -> State:
+    """Test whether head (map f xs) raises the errors map f xs raises, even for elements after the first one"""
+    s = State()
+
+    # Create function f0(x) = 6 / x
+    s.create_function()
+    s.create_register(6)  # r0
+    s.create_register(2)  # r1
+    s._select_demonstration("r0", False)
+    s._select_demonstration("r1", True)
+    s._apply_demonstration("/", False)  # temp0 = 6 / r1 (3.0)
+    s._select_demonstration("temp0", True)
+    s.ret()  # f0
+
+    # Create function f1(xs) = head (map f0 xs)
+    s.create_function()
+    s.create_list([1, 2])  # l0
+    s._select_demonstration("f0", False)
+    s._select_demonstration("l0", True)
+    s._apply_demonstration("map", False)  # temp0 = map f0 l0
+    s._select_demonstration("temp0", True)
+    s._apply_demonstration("head", False)  # temp1 = head temp0
+    s._select_demonstration("temp1", True)
+    s.ret()  # f1
+
+    s.create_list([3, 0])  # l1
+    s._select_interactive_between("l1")
+    try:
+        s._apply_interactive_between("f1")
+    except ValueError as e:
+        assert "divide by zero" in str(e), e
+    else:
+        assert False, "f1 l1 should fail, since map f0 l1 divides by zero"
+    s.unselect_all()
+
+    s.update_list("l1", [3, 6])
+    s._select_interactive_between("l1")
+    s._apply_interactive_between("f1")  # r2 = 2.0
+    assert s.get_value("r2") == 2.0
+    print(s)
+    return s
+
+
+def _apply(s: State, function_name: str, *names: str) -> str:
+    """Selects ``names`` and applies ``function_name`` to them (interactive/between mode)"""
+    for name in names:
+        s._select_interactive_between(name)
+    return s._apply_interactive_between(function_name)
+
+
+def test_fused_chain() -> State:
+    """Test whether chains of map/filter (and head) applications, which are fused into a single pass inside custom
+    functions, compute the same results as applying map/filter/head one after another"""
+    s = State()
+
+    # Create function f0(x) = x + 1
+    s.create_function()
+    s.create_register(0)  # r0
+    s.create_register(1)  # r1
+    s._select_demonstration("r0", True)
+    s._select_demonstration("r1", False)
+    s._apply_demonstration("+", False)  # temp0 = r0 + 1
+    s._select_demonstration("temp0", True)
+    s.ret()  # f0
+
+    # Create function f1(x) = x % 2 == 0
+    s.create_function()
+    s.create_register(2)  # r2
+    s._select_demonstration("r0", True)
+    s._select_demonstration("r2", False)
+    s._apply_demonstration("%", False)  # temp0 = r0 % 2
+    s._select_demonstration("temp0", True)
+    s._select_demonstration("r0", False)
+    s._apply_demonstration("==", False)  # temp1 = temp0 == 0
+    s._select_demonstration("temp1", True)
+    s.ret()  # f1
+
+    # Create function f2(xs) = map f0 (filter f1 (map f0 xs))
+    s.create_function()
+    s.create_list([1, 2, 3])  # l0
+    s._select_demonstration("f0", False)
+    s._select_demonstration("l0", True)
+    s._apply_demonstration("map", False)  # temp0
+    s._select_demonstration("f1", False)
+    s._select_demonstration("temp0", True)
+    s._apply_demonstration("filter", False)  # temp1
+    s._select_demonstration("f0", False)
+    s._select_demonstration("temp1", True)
+    s._apply_demonstration("map", False)  # temp2
+    s._select_demonstration("temp2", True)
+    s.ret()  # f2
+
+    # Create function f3(xs) = head (filter f1 (map f0 xs))
+    s.create_function()
+    s._select_demonstration("f0", False)
+    s._select_demonstration("l0", True)
+    s._apply_demonstration("map", False)  # temp0
+    s._select_demonstration("f1", False)
+    s._select_demonstration("temp0", True)
+    s._apply_demonstration("filter", False)  # temp1
+    s._select_demonstration("temp1", True)
+    s._apply_demonstration("head", False)  # temp2
+    s._select_demonstration("temp2", True)
+    s.ret()  # f3
+
+    for value in ([], [2], [1], [1, 2, 3, 4], [3, 5, 8]):
+        list_name = s.create_list(value)
+        filtered = _apply(s, "filter", "f1", _apply(s, "map", "f0", list_name))
+        expected = s.get_value(_apply(s, "map", "f0", filtered))
+        assert s.get_value(_apply(s, "f2", list_name)) == expected, value
+
+        try:
+            expected = s.get_value(_apply(s, "head", filtered))
+        except ValueError as e:
+            s.unselect_all()
+            expected = str(e)
+        try:
+            result = s.get_value(_apply(s, "f3", list_name))
+        except ValueError as e:
+            s.unselect_all()
+            result = str(e)
+        assert result == expected, value
+    print(s)
+    return s
+
+
+def test_apply_cache() -> State:
+    """Test whether cached results of custom functions are neither shared with the caller nor returned for another
+    function that has been given the same unique id (after the state has been restored from an older copy, like
+    operations do if they fail)"""
+    s = State()
+    s.create_list([1, 2])  # l0
+    state_snap = s._state_copy()
+
+    # Create function f0(xs) = tail xs
+    s.create_function()
+    s._select_demonstration("l0", True)
+    s._apply_demonstration("tail", False)  # temp0
+    s._select_demonstration("temp0", True)
+    s.ret()  # f0
+
+    first = _apply(s, "f0", "l0")
+    second = _apply(s, "f0", "l0")  # Cache hit
+    assert s.get_value(first) == s.get_value(second) == [2]
+    s.append_to_list(first, 3)
+    assert s.get_value(second) == [2], "cached result has been shared"
+
+    # Go back to the copy and create another function, which gets the same unique id
+    unique_id = s.get_value("f0").unique_id
+    s._state_restore(state_snap)
+    s.create_function()
+    s._select_demonstration("l0", True)
+    s._apply_demonstration("init", False)  # temp0
+    s._select_demonstration("temp0", True)
+    s.ret()  # f0 = init
+    assert s.get_value("f0").unique_id == unique_id
+    assert s.get_value(_apply(s, "f0", "l0")) == [1]
+    print(s)
+    return s
+
+
 # TODO Add test for constant function - especially pay attention to the type
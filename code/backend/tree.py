@@ -15,10 +15,16 @@ class Tree:
     -----
     Example for path: ["T", "F"] means that from the root, we can reach the node to be created/self by first following
     the "true" branch and then the "false" branch.
+    Internally, the path is stored as a bitmask (the i-th bit is set iff the i-th step follows the "false" branch) and
+    its length, so nodes don't need to keep a list of their own. It is only turned back into a list when needed.
     """
 
+    # Avoids a per-instance dict (a node is created for every branch)
+    __slots__ = ("_path_bits", "_depth", "_block", "_true", "_false")
+
     def __init__(self, path: list[str]):
-        self._path: Path = path
+        self._path_bits: int = sum(1 << depth for depth, step in enumerate(path) if step == "F")
+        self._depth: int = len(path)
         self._block: list[Instruction] = []
         self._true: Tree | None = None
         self._false: Tree | None = None
@@ -37,6 +43,14 @@ class Tree:
         """Append instruction to instruction block"""
         self._block.append(instr)
 
+    def get_instructions(self) -> list[Instruction]:
+        """Return a (shallow) copy of the instruction block"""
+        return list(self._block)
+
+    def get_children(self) -> list[Tree]:
+        """Return a list of all existing child nodes ("true" child first)"""
+        return [child for child in (self._true, self._false) if child is not None]
+
     def remaining_examples(self) -> list[Path]:
         """
         Returns a list of paths, which represents the (additional) examples required for function synthesis
@@ -46,18 +60,21 @@ class Tree:
         [["T", "F"], ["F", "F"]] means that we will need two examples:
         One where the first condition is True and the second False, and another one where both conditions are false.
         """
-
-        true_empty = self._true is None
-        false_empty = self._false is None
-
-        if not true_empty and not false_empty:  # Both are not None => Go deeper
-            return self._true.remaining_examples() + self._false.remaining_examples()
-        elif true_empty and not false_empty:
-            return [self._path + ["T"]] + self._false.remaining_examples()
-        elif not true_empty and false_empty:
-            return self._true.remaining_examples() + [self._path + ["F"]]
-        elif true_empty and false_empty:  # Both are None => There is no branching
-            return []
+        # Walks the tree with an explicit stack (instead of recursing and concatenating the results of the children).
+        # The stack contains nodes which still need to be visited and paths of missing children, which are ready to be
+        # added to the result. Pushing the "false" side first makes sure that the "true" side is handled first.
+        result: list[Path] = []
+        stack: list[Tree | Path] = [self]
+        while stack:
+            item = stack.pop()
+            if not isinstance(item, Tree):  # Path of a missing child
+                result.append(item)
+                continue
+            if item._true is None and item._false is None:  # There is no branching
+                continue
+            stack.append(item._get_path() + ["F"] if item._false is None else item._false)
+            stack.append(item._get_path() + ["T"] if item._true is None else item._true)
+        return result
 
     def get_true(self, modify: bool = False) -> Tree:
         """
@@ -70,7 +87,7 @@ class Tree:
         """
         if self._true is None:
             if modify:
-                self._true = Tree(self._path + ["T"])
+                self._true = self._create_child(False)
             else:
                 raise ValueError("true child does not exist + not allowed to create a new child")
         return self._true
@@ -86,7 +103,18 @@ class Tree:
         """
         if self._false is None:
             if modify:
-                self._false = Tree(self._path + ["F"])
+                self._false = self._create_child(True)
             else:
                 raise ValueError("false child does not exist + not allowed to create a new child")
         return self._false
+
+    def _get_path(self) -> Path:
+        """Returns the path from the root to this node"""
+        return ["F" if self._path_bits >> depth & 1 else "T" for depth in range(self._depth)]
+
+    def _create_child(self, is_false: bool) -> Tree:
+        """Returns a new node, which is reached from this node via the "true" or "false" branch (``is_false``)"""
+        child = Tree([])
+        child._path_bits = self._path_bits | (is_false << self._depth)
+        child._depth = self._depth + 1
+        return child
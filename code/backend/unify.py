@@ -6,47 +6,139 @@
 # https://stackoverflow.com/questions/16258553/how-can-i-define-algebraic-data-types-in-python
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import get_args
+from collections import deque
+from dataclasses import dataclass, field, fields
+from weakref import WeakValueDictionary
 
 
 # This class contains the implementation of the unification algorithm which is heavily used for the type system we are
 # implementing
 
+# Tags identifying the kind of a term (cp. KIND of each term), which are cheaper to dispatch on than the class
+_KIND_VAR = 0
+_KIND_NUM = 1
+_KIND_BOOL = 2
+_KIND_LIST = 3
+_KIND_APP = 4
+
+
+class _Term:
+    """Base of all terms. Terms are immutable, so copies can share them instead of copying them."""
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    def __reduce__(self):
+        # Recreate terms through their constructor (which also computes the cached attributes, cp. Var)
+        return type(self), tuple(getattr(self, f.name) for f in fields(self) if f.init)
+
+
 # Define types of "objects" (in the general sense) in the system
 # We define our types as immutable dataclass, so we can easily compare them for equivalence and use pattern matching
-@dataclass(frozen=True)
-class Var:
+# NOTE: Each term stores its free variables in _fv (computed once at construction, cp. free_variables) and its hash in
+#  _hash (so hashing a term doesn't recurse into its subterms). Neither is part of the comparison or the representation
+#  of the term.
+# Variables with the same name are equal, so we only keep a single instance per name (as long as it is used). Thus,
+# repeatedly created variables (e.g. by alpha_conversion) don't need to be set up again.
+_VAR_POOL: WeakValueDictionary[str, Var] = WeakValueDictionary()
+
+
+@dataclass(frozen=True, init=False)
+class Var(_Term):
+    KIND = _KIND_VAR  # Not a field, as it isn't annotated
     name: str
+    _fv: frozenset[Var] = field(init=False, compare=False, repr=False)
+    _hash: int = field(init=False, compare=False, repr=False)
+
+    def __new__(cls, name: str):
+        var = _VAR_POOL.get(name)
+        if var is None:
+            var = super().__new__(cls)
+            # Frozen dataclasses have to bypass their __setattr__. The hash has to be set first, as _fv contains the Var.
+            object.__setattr__(var, "name", name)
+            object.__setattr__(var, "_hash", hash((Var, name)))
+            object.__setattr__(var, "_fv", frozenset([var]))
+            _VAR_POOL[name] = var
+        return var
+
+    def __init__(self, name: str):
+        pass  # Already set up by __new__ (which might return an existing instance)
+
+    def __hash__(self):
+        return self._hash
 
     def __str__(self):
         return self.name
 
 
+# Num and Bool don't have any fields, so all their instances are equal. Thus, we only ever create a single instance of
+# each (flyweight), i.e. Num() always returns the same object. This also holds for copies, since copy/deepcopy/pickle
+# return the term itself or create new instances via __new__.
 @dataclass(frozen=True)
-class Num:
+class Num(_Term):
+    KIND = _KIND_NUM  # Not a field, as it isn't annotated
+    _instance = None  # Not a field either
+    _fv = frozenset()  # Not a field either (shared by all instances)
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __str__(self):
         return "Num"
 
 
 @dataclass(frozen=True)
-class Bool:
+class Bool(_Term):
+    KIND = _KIND_BOOL  # Not a field, as it isn't annotated
+    _instance = None  # Not a field either
+    _fv = frozenset()  # Not a field either (shared by all instances)
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __str__(self):
         return "Bool"
 
 
 @dataclass(frozen=True)
-class List:
+class List(_Term):
+    KIND = _KIND_LIST  # Not a field, as it isn't annotated
     a: Term
+    _fv: frozenset[Var] = field(init=False, compare=False, repr=False)
+    _hash: int = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_fv", self.a._fv)
+        object.__setattr__(self, "_hash", hash((List, self.a)))
+
+    def __hash__(self):
+        return self._hash
 
     def __str__(self):
         return f"[{str(self.a)}]"
 
 
 @dataclass(frozen=True)
-class App:
+class App(_Term):
+    KIND = _KIND_APP  # Not a field, as it isn't annotated
     a: Term
     b: Term
+    _fv: frozenset[Var] = field(init=False, compare=False, repr=False)
+    _hash: int = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_fv", self.a._fv | self.b._fv)
+        object.__setattr__(self, "_hash", hash((App, self.a, self.b)))
+
+    def __hash__(self):
+        return self._hash
 
     def __str__(self):
         return f"({str(self.a)} -> {str(self.b)})"
@@ -62,47 +154,41 @@ Term = Fun | Var
 Equation = tuple[Term, Term]
 
 
-def free_variables(t: Term) -> set[Var]:
-    """Return set of free variables in term t"""
-    match t:
-        case Var(_):
-            return {t}
-        case Num():
-            return set()
-        case Bool():
-            return set()
-        case List(a):
-            return free_variables(a)
-        case App(a, b):
-            return free_variables(a) | free_variables(b)
-        case _:
-            assert False, f"Pattern matching in free_variables failed: received t of type {type(t)}"
-
-
-def free_variables_equations(equations: list[Equation]) -> set[Var]:
-    """Return set of free variables in the list of equations ``equations``"""
-    result = set()
-    for lhs, rhs in equations:
-        result |= free_variables(lhs) | free_variables(rhs)
-    return result
+def free_variables(t: Term) -> frozenset[Var]:
+    """Return set of free variables in term t (frozenset, as it is shared with the term itself)"""
+    return t._fv
 
 
-def substitute_term(x: Var, rt: Term, t: Term) -> Term:
-    """Return a new term where all occurrences of variable x in term t are substituted with term rt"""
-    match t:
-        case Var(_):
-            return rt if x == t else t
-        case Num():
-            return t
-        case Bool():
-            return t
-        case List(a):
-            subst_a = substitute_term(x, rt, a)
-            return List(subst_a)
-        case App(a, b):
-            subst_a = substitute_term(x, rt, a)
-            subst_b = substitute_term(x, rt, b)
-            return App(subst_a, subst_b)
+def substitute_term_dict(mapping: dict[Var, Term], t: Term) -> Term:
+    """Return a new term where all occurrences of the variables in ``mapping`` in term t are substituted with the term
+    they are mapped to (all at once)
+
+    Notes
+    -----
+    Uses an explicit stack (instead of recursion), so long chains of App don't hit the recursion limit. Subterms that
+    don't contain any variable of ``mapping`` are shared with t instead of being rebuilt.
+    """
+    results: list[Term] = []
+    stack: list[tuple[Term, bool]] = [(t, False)]  # Terms to visit and whether their subterms have been visited
+    while stack:
+        term, visited = stack.pop()
+        kind = term.KIND
+        if not visited and term._fv.isdisjoint(mapping):  # Includes Num, Bool and variables that aren't substituted
+            results.append(term)
+        elif kind == _KIND_VAR:
+            results.append(mapping[term])
+        elif kind == _KIND_APP:
+            if visited:
+                subst_b = results.pop()
+                results.append(App(results.pop(), subst_b))
+            else:
+                stack += [(term, True), (term.b, False), (term.a, False)]  # a is visited (and substituted) first
+        else:  # List
+            if visited:
+                results.append(List(results.pop()))
+            else:
+                stack += [(term, True), (term.a, False)]
+    return results[0]
 
 
 def alpha_conversion(x: Term, name: str, offset: int = 0) -> tuple[Term, int]:
@@ -148,27 +234,9 @@ def alpha_conversion(x: Term, name: str, offset: int = 0) -> tuple[Term, int]:
     if not offset >= 0:
         raise ValueError("offset has to be larger or equal to 0")
 
-    work_set = free_variables(x)
-    for free_variable in work_set:
-        x = substitute_term(free_variable, Var(f"{name}{offset}"), x)
-        offset += 1
-
-    return x, offset
-
-
-def substitute_equation(x: Var, rt: Term, eq: Equation) -> Equation:
-    """Return a new equation where all occurrences of variable ``x`` in equation ``eq`` are substituted with term
-    ``rt``"""
-    return substitute_term(x, rt, eq[0]), substitute_term(x, rt, eq[1])
-
-
-def substitute_list(x: Var, rt: Term, c: list) -> list:
-    """Return a new list where all occurrences of variable ``x`` in list ``c`` are substituted with term ``rt``"""
-    subst_c = []
-    for eq in c:
-        subst_eq = substitute_equation(x, rt, eq)
-        subst_c.append(subst_eq)
-    return subst_c
+    # Substitute all free variables in a single pass (instead of walking x once per free variable)
+    mapping = {free_variable: Var(f"{name}{offset + i}") for i, free_variable in enumerate(free_variables(x))}
+    return substitute_term_dict(mapping, x), offset + len(mapping)
 
 
 def _decompose_functions(lhs: Fun, rhs: Fun) -> list[Equation]:
@@ -179,17 +247,14 @@ def _decompose_functions(lhs: Fun, rhs: Fun) -> list[Equation]:
     NoSolutionError
         If lhs = rhs cannot be decomposed
     """
-    match lhs, rhs:
-        case Num(), Num():
-            return []
-        case Bool(), Bool():
-            return []
-        case List(a), List(b):
-            return [(a, b)]  # TODO: Can I make sure that a and b have the correct type annotated and not Any?
-        case App(a, b), App(c, d):
-            return [(a, c), (b, d)]
-        case _:
-            raise NoSolutionError(f"Cannot decompose {lhs} = {rhs}")
+    kind = lhs.KIND
+    if kind != rhs.KIND:
+        raise NoSolutionError(f"Cannot decompose {lhs} = {rhs}")
+    if kind == _KIND_APP:
+        return [(lhs.a, rhs.a), (lhs.b, rhs.b)]
+    if kind == _KIND_LIST:
+        return [(lhs.a, rhs.a)]  # TODO: Can I make sure that a and b have the correct type annotated and not Any?
+    return []  # Num = Num or Bool = Bool
 
 
 # References (for implementation)
@@ -209,6 +274,15 @@ def unify(equations: list[Equation]) -> list[Equation]:  # Test this
     equations
         List of equations to be unified
 
+    Notes
+    -----
+    Instead of substituting eliminated variables into all remaining equations, the variables are kept in a disjoint-set
+    forest (``parent``), where each variable points either to another variable of the same set, or (if it is the
+    representative of its set) to the term it has been unified with, if any. Equations are taken from a worklist, so
+    decomposing a pair of functions only adds the new equations instead of rebuilding the whole list. The result
+    contains one equation for every variable that has been eliminated, with the fully resolved term as rhs (i.e. the
+    same solved form the rule-based algorithm returns, up to the names of variables which are unified with each other).
+
     Raises
     ------
     NoSolutionError
@@ -219,45 +293,97 @@ def unify(equations: list[Equation]) -> list[Equation]:  # Test this
     if not equations:  # Unifier of empty list
         return []
 
-    for idx in range(len(equations)):
-        result, applied = _apply_rule(equations, idx)  # Try to apply a rule
-        if applied:  # Do unification as long as we can apply a rule
-            return unify(result)
+    parent: dict[Var, Term] = {}
+    rank: dict[Var, int] = {}
+    worklist = deque(equations)
+    while worklist:
+        lhs, rhs = worklist.popleft()
+        lhs = _find(parent, lhs)
+        rhs = _find(parent, rhs)
+        if lhs == rhs:  # delete
+            continue
+        lhs_is_var = lhs.KIND == _KIND_VAR
+        rhs_is_var = rhs.KIND == _KIND_VAR
+        if lhs_is_var and rhs_is_var:  # eliminate (link the root with lower rank to the one with higher rank)
+            lhs_rank = rank.get(lhs, 0)
+            rhs_rank = rank.get(rhs, 0)
+            if lhs_rank > rhs_rank:
+                parent[rhs] = lhs
+            else:
+                parent[lhs] = rhs
+                if lhs_rank == rhs_rank:
+                    rank[rhs] = rhs_rank + 1
+        elif lhs_is_var or rhs_is_var:  # swap, check and eliminate
+            var, term = (lhs, rhs) if lhs_is_var else (rhs, lhs)
+            if _occurs(parent, var, term):
+                raise NoSolutionError(f"lhs: {var} occurs in rhs: {_resolve(parent, term, {})}")
+            parent[var] = term
+        else:  # decompose and conflict
+            worklist.extend(_decompose_functions(lhs, rhs))
+
+    resolved: dict[Var, Term] = {}
+    result = [(var, _resolve(parent, var, resolved)) for var in parent]
+    _check_list(result)
 
-    _check_list(equations)
+    return result
 
-    return equations  # No rule was applied to any equation in the list
 
+def _find(parent: dict[Var, Term], t: Term) -> Term:
+    """Returns the representative of term ``t``, i.e. the term the root of its set has been unified with, or the root
+    itself if it hasn't been unified with a function yet. Terms that aren't variables represent themselves.
 
-# https://stackoverflow.com/questions/45957615/check-a-variable-against-union-type-at-runtime-in-python-3-6
-def _apply_rule(equations: list[Equation], idx: int) -> tuple[list[Equation], bool]:
+    Notes
+    -----
+    Iterative (instead of recursive) and with full path compression: Afterwards, all variables on the path from t point
+    directly to the representative.
     """
-    Tries to apply a unification rule on the equation at `idx`.
-    Returns the resulting set of equations and whether a rule was actually applied.
-    If no rule was applied, it restores the passed list.
+    representative = t
+    while isinstance(representative, Var) and representative in parent:
+        representative = parent[representative]
+    while t is not representative and isinstance(t, Var):
+        next_t = parent[t]
+        parent[t] = representative
+        t = next_t
+    return representative
 
-    Raises
-    ------
-    NoSolutionError
-        If rule "conflict" or "check" applies
+
+def _occurs(parent: dict[Var, Term], x: Var, t: Term) -> bool:
+    """Returns whether the (unbound) variable ``x`` occurs in term ``t`` once all of its variables are resolved
+
+    Notes
+    -----
+    Only the (cached) free variables of the terms are visited instead of their whole structure. Each variable is only
+    visited once, as variables can be bound to terms sharing the same variables.
     """
-    lhs, rhs = equations.pop(idx)
-    rest = equations
-    if lhs == rhs:  # delete
-        return rest, True
-    elif isinstance(lhs, get_args(Fun)) and isinstance(rhs, get_args(Fun)):  # decompose and conflict
-        return rest + _decompose_functions(lhs, rhs), True
-    elif isinstance(lhs, get_args(Fun)) and isinstance(rhs, Var):  # swap
-        return rest + [(rhs, lhs)], True
-    # eliminate
-    elif isinstance(lhs, Var) and (lhs not in free_variables(rhs)) and (lhs in free_variables_equations(rest)):
-        return substitute_list(lhs, rhs, rest) + [(lhs, rhs)], True
-    elif isinstance(lhs, Var) and isinstance(rhs, get_args(Fun)) and (lhs in free_variables(rhs)):  # check
-        raise NoSolutionError(f"lhs: {lhs} occurs in rhs: {rhs}")
-    else:  # If we cannot apply a rule: undo pop and return
-        rest.insert(idx, (lhs, rhs))
-        restored = rest
-        return restored, False
+    stack = list(t._fv)
+    visited: set[Var] = set()
+    while stack:
+        variable = stack.pop()
+        if variable in visited:
+            continue
+        visited.add(variable)
+        representative = _find(parent, variable)
+        if representative == x:
+            return True
+        if representative.KIND != _KIND_VAR:
+            stack.extend(representative._fv)
+    return False
+
+
+def _resolve(parent: dict[Var, Term], t: Term, resolved: dict[Var, Term]) -> Term:
+    """Returns term ``t`` where all variables are replaced by their fully resolved representative. Variables that have
+    already been resolved are cached in ``resolved``."""
+    if isinstance(t, Var):
+        if t not in resolved:
+            representative = _find(parent, t)
+            resolved[t] = representative if isinstance(representative, Var) else _resolve(parent, representative,
+                                                                                         resolved)
+        return resolved[t]
+    if isinstance(t, App):
+        return App(_resolve(parent, t.a, resolved), _resolve(parent, t.b, resolved))
+    if isinstance(t, List):
+        return List(_resolve(parent, t.a, resolved))
+    return t  # Num and Bool
 
 
 def _check_type(term: Term) -> None:
@@ -269,28 +395,15 @@ def _check_type(term: Term) -> None:
     ValueError
         If term has an unsupported type
     """
-    match term:
-        case Var(_):
-            pass
-        case Num():
-            pass
-        case Bool():
-            pass
-        case List(a):
-            match a:
-                case Num():
-                    pass
-                case Bool():
-                    pass
-                case Var(_):
-                    pass
-                case _:
-                    raise ValueError(f"System does not support type {term}")
-        case App(a, b):
-            _check_type(a)
-            _check_type(b)
-        case _:  # Although this case shouldn't even occur
-            raise ValueError(f"System does not support type {term} [First level pattern matching failed]")
+    kind = getattr(term, "KIND", None)
+    if kind == _KIND_LIST:
+        if term.a.KIND == _KIND_LIST or term.a.KIND == _KIND_APP:  # Only lists of Var, Num and Bool are supported
+            raise ValueError(f"System does not support type {term}")
+    elif kind == _KIND_APP:
+        _check_type(term.a)
+        _check_type(term.b)
+    elif kind is None:  # Although this case shouldn't even occur
+        raise ValueError(f"System does not support type {term} [First level pattern matching failed]")
 
 
 # NOTE: Maybe it would be better to have a generic function lifting functions from terms, to equations, to lists?
@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (
 )
 
 from gui import singletons
-from gui.helper_widgets import ClickableLabel
+from gui.helper_widgets import ClickableLabel, remove_widget, sync_widgets
 
 
 class BuiltinCollection(QGroupBox):
@@ -51,21 +51,26 @@ class CustomFunctionCollection(QGroupBox):
 
     def add_function_widget(self, function_name: str):
         """Add a widget to CustomFunctionCollection"""
-        function_widget = CustomFunctionWidget(function_name)
-        self._custom_function_collection.addWidget(function_widget)
-        singletons.selected_manager.watch_widget(function_widget.label)
+        self._custom_function_collection.addWidget(_make_function_widget(function_name))
 
     def clear(self):
         """Remove all widgets (i.e. widgets of user-defined functions) within CustomFunctionCollection"""
         # https://stackoverflow.com/questions/4528347/clear-all-widgets-in-a-layout-in-pyqt
         for i in reversed(range(self._custom_function_collection.count())):
-            self._custom_function_collection.itemAt(i).widget().deleteLater()
+            remove_widget(self._custom_function_collection, self._custom_function_collection.itemAt(i).widget())
 
     def rebuild(self):
-        """Remove all widgets within CustomFunctionCollection and add widgets for all custom functions in the State"""
-        self.clear()
-        for f_name in singletons.state.get_custom_function_names():
-            self.add_function_widget(f_name)
+        """Make CustomFunctionCollection show a widget for each custom function in the State (cp. sync_widgets)"""
+        sync_widgets(self._custom_function_collection, singletons.state.get_custom_function_names(),
+                     _make_function_widget)
+
+
+def _make_function_widget(function_name: str) -> "CustomFunctionWidget":
+    """Returns a new widget for the user-defined function ``function_name``, whose label is watched by the selected
+    manager"""
+    function_widget = CustomFunctionWidget(function_name)
+    singletons.selected_manager.watch_widget(function_widget.label)
+    return function_widget
 
 
 class CustomFunctionWidget(QWidget):
@@ -88,6 +93,13 @@ class CustomFunctionWidget(QWidget):
 
         self.setLayout(outer_layout)
 
+    @property
+    def identifier(self) -> str:
+        return self._function_name
+
+    def refresh(self):
+        pass  # The widget only shows the name of the function, which doesn't change
+
     def delete_was_clicked(self):
         """Call functions required to delete a function from the state and GUI"""
         singletons.state.delete_function(self._function_name)
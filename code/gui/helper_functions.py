@@ -1,5 +1,10 @@
+import re
+
 from backend.helper_type import PValue
 
+# Strings int() accepts (surrounding whitespace, sign, digits which may be grouped by underscores)
+_INT_PATTERN = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*")
+
 
 def str_to_bool(s: str) -> bool:
     """Converts the passed string 'True'/'False' to boolean True/False
@@ -22,17 +27,21 @@ def str_to_int_float(s: str) -> int | float:
 
     Notes
     -----
-    We first try to convert the passed string into an int. Only if this fails we try to convert it into a float.
+    If the passed string looks like an int, we convert it into an int. Otherwise, we try to convert it into a float. (We
+    check the string first instead of trying int and catching its ValueError, as raising is expensive.) int still
+    rejects strings with too many digits (cp. sys.set_int_max_str_digits), which become a float just like before.
 
     Raises
     ------
     ValueError
         If the passed string cannot be converted into an int or float
     """
-    try:
-        return int(s)
-    except ValueError:
-        return float(s)
+    if _INT_PATTERN.fullmatch(s):
+        try:
+            return int(s)
+        except ValueError:
+            pass
+    return float(s)
 
 
 def str_to_pvalue(s: str) -> PValue:
@@ -44,10 +53,11 @@ def str_to_pvalue(s: str) -> PValue:
     ValueError
         If the passed string cannot be converted into a primary value like int, float or bool
     """
-    try:
-        return str_to_bool(s)
-    except ValueError:
-        pass
+    # Same as trying str_to_bool first, but without raising (and catching) a ValueError for every number
+    if s == "True":
+        return True
+    if s == "False":
+        return False
     try:
         return str_to_int_float(s)
     except ValueError:
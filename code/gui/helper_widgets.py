@@ -1,9 +1,62 @@
+from typing import Callable
+
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import (
-    QHBoxLayout, QPushButton, QGroupBox, QLineEdit, QLabel
+    QHBoxLayout, QPushButton, QGroupBox, QLineEdit, QLabel, QBoxLayout, QLayout, QWidget
 )
 
 
+def remove_widget(layout: QLayout, widget: QWidget) -> None:
+    """Removes ``widget`` from ``layout`` right away and deletes it once control returns to the event loop
+
+    Notes
+    -----
+    The widget is still deleted with deleteLater (instead of e.g. dropping its parent and last reference), since it
+    might be removed while one of its own signals is being handled. Removing it from the layout immediately makes sure
+    the layout (and everyone iterating over it) doesn't see the widget anymore in the meantime. Its signals are blocked
+    as well, so it cannot notify anyone watching it (e.g. the SelectedManager) about changes while it is torn down.
+    """
+    layout.removeWidget(widget)
+    widget.blockSignals(True)
+    widget.deleteLater()
+
+
+def sync_widgets(layout: QBoxLayout, identifiers: list[str], create_widget: Callable[[str], QWidget]) -> None:
+    """Makes ``layout`` show exactly one widget for each identifier in ``identifiers`` (in the same order)
+
+    Widgets whose identifier is still in ``identifiers`` are kept and refreshed, all other widgets are removed. Widgets
+    for new identifiers are created using ``create_widget`` and inserted at their position. Widgets in ``layout`` need
+    to have an attribute ``identifier`` and a method ``refresh()``.
+
+    Notes
+    -----
+    Only the difference to the widgets currently shown is applied, since destroying and re-creating all widgets (e.g.
+    after every undo/redo) is expensive. If the kept widgets are in a different order than their identifiers (which
+    usually doesn't happen, since names are generated in increasing order), all widgets are re-created instead.
+    """
+    wanted = set(identifiers)
+    kept: dict[str, QWidget] = {}
+    for i in reversed(range(layout.count())):
+        widget = layout.itemAt(i).widget()
+        if widget.identifier in wanted:
+            kept[widget.identifier] = widget
+        else:
+            remove_widget(layout, widget)
+
+    kept_order = list(reversed(kept))  # kept has been filled starting from the last widget
+    if kept_order != [identifier for identifier in identifiers if identifier in kept]:
+        for widget in kept.values():
+            remove_widget(layout, widget)
+        kept = {}
+
+    for index, identifier in enumerate(identifiers):
+        widget = kept.get(identifier)
+        if widget is None:
+            layout.insertWidget(index, create_widget(identifier))
+        else:
+            widget.refresh()
+
+
 class WidgetCollection(QGroupBox):
     """Collection of widgets together with a + button (to add new widgets)"""
     def __init__(self, group_name: str, parent=None):
@@ -28,11 +81,15 @@ class WidgetCollection(QGroupBox):
     def create_was_clicked(self):
         pass
 
+    def get_widgets(self) -> list:
+        """Returns all widgets in the widget collection (in order)"""
+        return [self._widget_collection.itemAt(i).widget() for i in range(self._widget_collection.count())]
+
     def clear_widget_collection(self):
         """Remove all widgets from the widget collection"""
         # https://stackoverflow.com/questions/4528347/clear-all-widgets-in-a-layout-in-pyqt
         for i in reversed(range(self._widget_collection.count())):
-            self._widget_collection.itemAt(i).widget().deleteLater()
+            remove_widget(self._widget_collection, self._widget_collection.itemAt(i).widget())
 
 
 class CellWidget(QGroupBox):
@@ -47,7 +104,9 @@ class CellWidget(QGroupBox):
 
         self._valueEdit = QLineEdit()
         self._valueEdit.setFixedWidth(40)
-        self._valueEdit.setText(str(self.get_value()))
+        # Text of the last value that has been shown or committed, so edits restoring it don't have to be parsed again
+        self._committed_text = str(self.get_value())
+        self._valueEdit.setText(self._committed_text)
         self._layout_h.addWidget(self._valueEdit)
 
         delete_button = QPushButton()
@@ -60,7 +119,7 @@ class CellWidget(QGroupBox):
         self.setLayout(self._layout_h)
 
         # Finish setting up widgets
-        self._valueEdit.editingFinished.connect(self.value_was_edited)
+        self._valueEdit.editingFinished.connect(self._editing_finished)
         delete_button.clicked.connect(self.delete_was_clicked)
 
     # Child classes should override this
@@ -70,6 +129,24 @@ class CellWidget(QGroupBox):
         """
         pass
 
+    def refresh(self):
+        """Displays the current internal value of the cell again (e.g. after the state has been restored)"""
+        self._committed_text = str(self.get_value())
+        self._valueEdit.setText(self._committed_text)
+
+    def _editing_finished(self):
+        # editingFinished is also emitted if the cell just loses focus, e.g. when clicking somewhere else. Only handle
+        # actual edits, so we don't update the state (and create a snapshot) for every click
+        if not self._valueEdit.isModified():
+            return
+        self._valueEdit.setModified(False)
+        # The text might have been changed back to the committed one (e.g. 5 -> 6 -> 5), so there is nothing to parse
+        text = self._valueEdit.text()
+        if text == self._committed_text:
+            return
+        self.value_was_edited()
+        self._committed_text = text  # Only if the edit was accepted, i.e. value_was_edited didn't raise
+
     # Child classes should override this
     def value_was_edited(self):
         pass
@@ -97,6 +174,10 @@ class ClickableLabel(QLabel):
         self._identifier = identifier
         super().__init__(label_name)
 
+    @property
+    def identifier(self) -> str:
+        return self._identifier
+
     def mousePressEvent(self, ev):
         if ev.button() == Qt.LeftButton:
             self.leftClicked.emit(self._identifier)
@@ -1,9 +1,11 @@
+from __future__ import annotations
+
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtWidgets import QWidget, QInputDialog, QHBoxLayout, QPushButton
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton
 
 from gui import singletons
 from gui.helper_functions import str_to_pvalue
-from gui.helper_widgets import CellWidget, WidgetCollection
+from gui.helper_widgets import CellWidget, WidgetCollection, remove_widget, sync_widgets
 from backend.helper_type import PValue
 
 
@@ -18,14 +20,17 @@ class ListCollection(WidgetCollection):
         singletons.app_snapper.create_snapshot()
 
     def create_list_widget(self, list_name: str):
-        list_widget = ListWidgetWithDelete(list_name)
-        self._widget_collection.addWidget(list_widget)
-        singletons.selected_manager.watch_widget(list_widget)
+        self._widget_collection.addWidget(_make_list_widget(list_name))
 
     def rebuild(self):
-        self.clear_widget_collection()
-        for list_name in singletons.state.get_list_names():
-            self.create_list_widget(list_name)
+        sync_widgets(self._widget_collection, singletons.state.get_list_names(), _make_list_widget)
+
+
+def _make_list_widget(list_name: str) -> "ListWidgetWithDelete":
+    """Returns a new widget for list ``list_name``, which is watched by the selected manager"""
+    list_widget = ListWidgetWithDelete(list_name)
+    singletons.selected_manager.watch_widget(list_widget)
+    return list_widget
 
 
 class ListWidgetWithDelete(QWidget):
@@ -48,11 +53,19 @@ class ListWidgetWithDelete(QWidget):
         delete_button.clicked.connect(self.delete_was_clicked)
         layout.addWidget(delete_button)
 
-        list_widget = ListWidget(list_name)
-        layout.addWidget(list_widget)
+        self._list_widget = ListWidget(list_name, self)
+        layout.addWidget(self._list_widget)
 
         self.setLayout(layout)
 
+    @property
+    def identifier(self) -> str:
+        return self._list_name
+
+    def refresh(self):
+        """Displays the current values of the list again (cp. ListWidget.refresh)"""
+        self._list_widget.refresh()
+
     def delete_was_clicked(self):
         singletons.state.delete_list(self._list_name)
         # Why emit -> deleteLater is (probably) fine:
@@ -73,79 +86,102 @@ class ListWidgetWithDelete(QWidget):
 
 
 class ListWidget(WidgetCollection):
-    """A list widget is a collection of list element widgets"""
-    def __init__(self, list_name: str):
+    """A list widget is a collection of list element widgets. ``owner`` is the widget representing the whole list,
+    which is notified about modifications."""
+    def __init__(self, list_name: str, owner: ListWidgetWithDelete):
         self._list_name = list_name
+        self._owner = owner
+        # Element widgets in the order they are shown (i.e. the i-th widget shows the element at index i), so inserting
+        # or deleting an element only needs to touch the subsequent widgets
+        self._elements: list[ListElementWidget] = []
 
         super().__init__(list_name)
 
-        # create elements based on state
-        list_value = singletons.state.get_list(list_name)
+        self._create_elements()
+
+    def _create_elements(self):
+        """Create element widgets based on state"""
+        list_value = singletons.state.get_list(self._list_name)
         for i in range(len(list_value)):
-            list_element_widget = ListElementWithInsertWidget(self._list_name, i)
+            list_element_widget = ListElementWidget(self._list_name, i, self)
             self._widget_collection.addWidget(list_element_widget)
+            self._elements.append(list_element_widget)
+
+    def refresh(self):
+        """Displays the current values of the list elements again. If the shown elements don't match the elements of
+        the list in the state anymore (i.e. the list has a different length), the element widgets are re-created."""
+        if (len(self._elements) != len(singletons.state.get_list(self._list_name)) or
+                any(element_widget.list_index != i for i, element_widget in enumerate(self._elements))):
+            self.clear_widget_collection()
+            self._elements.clear()
+            self._create_elements()
+            return
+        for element_widget in self._elements:
+            element_widget.refresh()
 
     def create_was_clicked(self):  # Append
-        self.create_list_element(len(self._widget_collection))
+        self.create_list_element(len(self._elements))
+
+    def was_modified(self):
+        self._owner.was_modified()
 
     def list_element_was_deleted(self, index: int):
-        # https://stackoverflow.com/questions/70893947/how-to-get-list-of-widgets-in-pyqt
-        # Update indices of subsequent elements
-        for i in range(self._widget_collection.count()):
-            widget = self._widget_collection.itemAt(i).widget()
-            new_index = (widget.list_index - 1) if widget.list_index > index else widget.list_index
-            widget.update_index(new_index)
+        # Update indices of subsequent elements (with updates disabled, so their titles are repainted at once)
+        self.setUpdatesEnabled(False)
+        try:
+            for widget in self._elements[index + 1:]:
+                widget.update_index(widget.list_index - 1)
+        finally:
+            self.setUpdatesEnabled(True)
+        remove_widget(self._widget_collection, self._elements.pop(index))
 
     def create_list_element(self, index: int):
-        # TODO: Maybe we should destroy this object after use
-        # https://doc.qt.io/qtforpython-5/PySide2/QtWidgets/QInputDialog.html#more
-        text, ok = QInputDialog().getText(self, "New list element", "Enter the value for the new list element")
+        text, ok = singletons.get_text_input(self, "New list element", "Enter the value for the new list element")
         if ok and text:
-            # Update indices of subsequent elements
-            for i in range(self._widget_collection.count()):
-                widget = self._widget_collection.itemAt(i).widget()
-                new_index = (widget.list_index + 1) if widget.list_index >= index else widget.list_index
-                widget.update_index(new_index)
-
+            # Insert into the state first, so the widgets stay unchanged if the value cannot be inserted
             singletons.state.insert_list_element(self._list_name, str_to_pvalue(text), index)
-            list_element_widget = ListElementWithInsertWidget(self._list_name, index)
+
+            # Update indices of subsequent elements (cp. list_element_was_deleted)
+            self.setUpdatesEnabled(False)
+            try:
+                for widget in self._elements[index:]:
+                    widget.update_index(widget.list_index + 1)
+            finally:
+                self.setUpdatesEnabled(True)
+
+            list_element_widget = ListElementWidget(self._list_name, index, self)
             self._widget_collection.insertWidget(index, list_element_widget)
+            self._elements.insert(index, list_element_widget)
+            self.was_modified()  # Once per insertion, after all indices have been updated
             singletons.app_snapper.create_snapshot()
 
 
-class ListElementWithInsertWidget(QWidget):
-    """+ button (for insertion) together with a list element"""
-    def __init__(self, list_name: str, list_index: int):
-        self.list_index = list_index
-        super().__init__()
+class ListElementWidget(CellWidget):
+    """Widget representing the value of a list element together with a + button (to insert a new element in front of
+    it). ``owner`` is the list widget showing the element."""
+    def __init__(self, list_name: str, list_index: int, owner: ListWidget):
+        # NOTE: Check for valid inputs?
+        self._list_name = list_name
+        self._list_index = list_index
+        # The owner is passed explicitly instead of climbing up the widget tree with parent(), which depends on how the
+        # widgets are nested
+        self._owner = owner
 
-        layout = QHBoxLayout()
+        super().__init__(f"{self._list_name}[{self._list_index}]")
 
+        # NOTE: The + button is added to the layout of the cell itself. Wrapping the cell in another widget (with its
+        #  own layout) just for the button would cost an additional QWidget and QHBoxLayout for every list element.
         insert_button = QPushButton("+")
         insert_button.setFixedWidth(30)
         insert_button.clicked.connect(self.insert_was_clicked)
-        self._list_element = ListElementWidget(list_name, list_index)
+        self._layout_h.insertWidget(0, insert_button)
 
-        layout.addWidget(insert_button)
-        layout.addWidget(self._list_element)
-        self.setLayout(layout)
+    @property
+    def list_index(self) -> int:
+        return self._list_index
 
     def insert_was_clicked(self):
-        self.parent().create_list_element(self.list_index)
-
-    def update_index(self, new_index: str):
-        self.list_index = new_index
-        self._list_element.update_index(new_index)
-
-
-class ListElementWidget(CellWidget):
-    """Widget representing the value of a list element"""
-    def __init__(self, list_name: str, list_index: int):
-        # NOTE: Check for valid inputs?
-        self._list_name = list_name
-        self._list_index = list_index
-
-        super().__init__(f"{self._list_name}[{self._list_index}]")
+        self._owner.create_list_element(self._list_index)
 
     def get_value(self):
         return singletons.state.get_list_element(self._list_name, self._list_index)
@@ -153,18 +189,17 @@ class ListElementWidget(CellWidget):
     def value_was_edited(self):
         value: PValue = str_to_pvalue(self._valueEdit.text())
         singletons.state.update_list_element(self._list_name, value, self._list_index)
-        self.parent().parent().parent().was_modified()
+        self._owner.was_modified()
         singletons.app_snapper.create_snapshot()
 
     # NOTE: Order of operations in delete could become problematic/cause bugs
     def delete_was_clicked(self):
         singletons.state.delete_list_element(self._list_name, self._list_index)
-        self.parent().parent().list_element_was_deleted(self._list_index)
-        self.parent().parent().parent().was_modified()
-        self.parent().deleteLater()
+        self._owner.list_element_was_deleted(self._list_index)  # Also removes the widget of the element
+        self._owner.was_modified()
         singletons.app_snapper.create_snapshot()
 
-    def update_index(self, new_index: str):
+    def update_index(self, new_index: int):
         self._list_index = new_index
         self._update_title()
 
@@ -1,7 +1,4 @@
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtWidgets import (
-    QInputDialog
-)
 
 # References for PyQt
 # https://www.pythonguis.com/tutorials/pyqt-signals-slots-events/
@@ -11,7 +8,7 @@ from PyQt5.QtWidgets import (
 # https://zetcode.com/gui/pyqt5/customwidgets/
 from gui import singletons
 from gui.helper_functions import str_to_pvalue
-from gui.helper_widgets import WidgetCollection, CellWidget
+from gui.helper_widgets import WidgetCollection, CellWidget, sync_widgets
 from backend.helper_type import PValue
 
 
@@ -21,22 +18,24 @@ class RegisterCollection(WidgetCollection):
         super().__init__("Registers")
 
     def create_was_clicked(self):
-        # TODO: Maybe we should destroy this object after use or create it once and keep it around
-        text, ok = QInputDialog().getText(self, "New register", "Enter the value for the new register")
+        text, ok = singletons.get_text_input(self, "New register", "Enter the value for the new register")
         if ok and text:
             register_name = singletons.state.create_register(str_to_pvalue(text))
             self.create_register_widget(register_name)
         singletons.app_snapper.create_snapshot()
 
     def create_register_widget(self, register_name: str):
-        register_widget = RegisterWidget(register_name)
-        self._widget_collection.addWidget(register_widget)
-        singletons.selected_manager.watch_widget(register_widget)
+        self._widget_collection.addWidget(_make_register_widget(register_name))
 
     def rebuild(self):
-        self.clear_widget_collection()
-        for register in singletons.state.get_register_names():
-            self.create_register_widget(register)
+        sync_widgets(self._widget_collection, singletons.state.get_register_names(), _make_register_widget)
+
+
+def _make_register_widget(register_name: str) -> "RegisterWidget":
+    """Returns a new widget for register ``register_name``, which is watched by the selected manager"""
+    register_widget = RegisterWidget(register_name)
+    singletons.selected_manager.watch_widget(register_widget)
+    return register_widget
 
 
 class RegisterWidget(CellWidget):
@@ -53,6 +52,10 @@ class RegisterWidget(CellWidget):
 
         super().__init__(register_name)
 
+    @property
+    def identifier(self) -> str:
+        return self._register_name
+
     def get_value(self) -> PValue:
         return singletons.state.get_register(self._register_name)
 
@@ -13,6 +13,7 @@ from PyQt5.QtWidgets import (
 )
 
 from gui import singletons
+from gui.helper_widgets import remove_widget
 
 
 class SelectedManager:
@@ -63,6 +64,8 @@ class SelectedManager:
 
     def watch_widget(self, widget):
         # widget needs to have signals leftClicked, rightClicked, modified and deleted
+        # NOTE: Every widget is watched exactly once, right after it has been created (e.g. _make_register_widget), so
+        #  connections can't pile up. Qt drops the connections itself once the widget is destroyed.
         widget.leftClicked.connect(self.widget_was_left_clicked)
         widget.rightClicked.connect(self.widget_was_right_clicked)
         widget.modified.connect(self.value_was_modified)
@@ -115,6 +118,9 @@ class SelectedCollection(QGroupBox):
 
         self._widget_collection = QHBoxLayout()
         outer_layout.addLayout(self._widget_collection)
+        # Element widgets in the order they are shown, i.e. the i-th widget shows the selected element at index i (cp.
+        # ListWidget._elements)
+        self._elements: list[SelectedElementWidget] = []
 
         unselect_all_button = QPushButton("Unselect All")
         unselect_all_button.setFixedWidth(80)
@@ -126,27 +132,23 @@ class SelectedCollection(QGroupBox):
     def add(self, selected_index: int):
         selected_element_widget = SelectedElementWidget(selected_index)
         self._widget_collection.addWidget(selected_element_widget)
+        self._elements.append(selected_element_widget)
 
     def unselect(self, selected_index: int):
         singletons.state.unselect(selected_index)
 
-        # https://stackoverflow.com/questions/70893947/how-to-get-list-of-widgets-in-pyqt
-        for i in range(self._widget_collection.count()):
-            widget = self._widget_collection.itemAt(i).widget()
-
-            # Without this guard we might access the deleted selected item in update_label()
-            if widget.selected_index == selected_index:
-                continue
-
-            new_index = (widget.selected_index - 1) if widget.selected_index > selected_index else widget.selected_index
-            widget.selected_index = new_index
+        # Only the subsequent elements move one position to the front
+        remove_widget(self._widget_collection, self._elements.pop(selected_index))
+        for widget in self._elements[selected_index:]:
+            widget.selected_index -= 1
 
         singletons.app_snapper.create_snapshot()
 
     def clear_all(self):
         # https://stackoverflow.com/questions/4528347/clear-all-widgets-in-a-layout-in-pyqt
         for i in reversed(range(self._widget_collection.count())):
-            self._widget_collection.itemAt(i).widget().deleteLater()
+            remove_widget(self._widget_collection, self._widget_collection.itemAt(i).widget())
+        self._elements.clear()
 
     def unselect_all(self):
         self.clear_all()
@@ -154,16 +156,25 @@ class SelectedCollection(QGroupBox):
         singletons.app_snapper.create_snapshot()
 
     def update_all_labels(self):
-        for i in range(self._widget_collection.count()):
-            widget = self._widget_collection.itemAt(i).widget()
-            widget.update_label()
+        selected = singletons.state.get_selected()  # Fetched once for all widgets (cp. SelectedElementWidget)
+        self.setUpdatesEnabled(False)  # Repaint the changed labels at once (cp. rebuild)
+        try:
+            for widget in self._elements:
+                widget.update_label(selected)
+        finally:
+            self.setUpdatesEnabled(True)
 
     def rebuild(self):
-        self.clear_all()
+        # Also called on its own (not only by rebuild_gui), so updates are disabled here as well (cp. rebuild_gui)
+        self.setUpdatesEnabled(False)
+        try:
+            self.clear_all()
 
-        selected = singletons.state.get_selected()
-        for i in range(len(selected)):
-            self.add(i)
+            selected = singletons.state.get_selected()
+            for i in range(len(selected)):
+                self.add(i)
+        finally:
+            self.setUpdatesEnabled(True)
 
 
 class SelectedElementWidget(QWidget):
@@ -183,12 +194,16 @@ class SelectedElementWidget(QWidget):
 
         self.setLayout(layout)
 
-    def update_label(self):
-        name, is_variable = singletons.state.get_selected()[self.selected_index]
+    def update_label(self, selected: list[tuple[str, bool]] | None = None):
+        """Updates the label with the current value of the selected element. ``selected`` can be passed if the selected
+        elements have already been fetched from the state (e.g. when updating the labels of all selected elements)"""
+        if selected is None:
+            name, is_variable = singletons.state.get_selected_at(self.selected_index)
+        else:
+            name, is_variable = selected[self.selected_index]
         value = singletons.state.get_value(name)
         self._label.setText(f"{[name]}: {value} ({'variable' if is_variable else 'constant'})")
 
     def unselect_was_clicked(self):
-        # Remove from singletons.state, update other indices accordingly and remove widget
+        # Remove from singletons.state, update other indices accordingly and remove widget (cp. SelectedCollection)
         self.parent().unselect(self.selected_index)
-        self.deleteLater()
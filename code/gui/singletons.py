@@ -1,4 +1,5 @@
-from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QInputDialog, QLabel, QWidget
 
 from gui.app_snapper import AppSnapper
 from gui.function_widget import CustomFunctionCollection
@@ -18,12 +19,13 @@ list_collection: ListCollection | None = None
 custom_function_collection: CustomFunctionCollection | None = None
 temporary_collection: TemporaryCollection | None = None
 app_snapper: AppSnapper | None = None
+input_dialog: QInputDialog | None = None  # Shared by all inputs of values (cp. get_text_input)
 
 
 # https://stackoverflow.com/questions/13034496/using-global-variables-between-files
 def initialize():
     global state, selected_manager, prompt, register_collection, list_collection, \
-        custom_function_collection, temporary_collection, app_snapper
+        custom_function_collection, temporary_collection, app_snapper, input_dialog
     state = State()
     selected_manager = SelectedManager()
     prompt = QLabel()
@@ -32,15 +34,31 @@ def initialize():
     custom_function_collection = CustomFunctionCollection()
     temporary_collection = TemporaryCollection()
     app_snapper = AppSnapper()
+    input_dialog = QInputDialog()
     app_snapper.create_snapshot()
 
 
 def rebuild_prompt():
     """Update the text of the prompt"""
-    if selected_manager.applying:
-        prompt.setText(SelectedManager.APPLY_PROMPT)
-    else:
-        prompt.setText(state.current_mode())
+    prompt.setText(SelectedManager.APPLY_PROMPT if selected_manager.applying else state.current_mode())
+
+
+def get_text_input(parent: QWidget, title: str, label: str) -> tuple[str, bool]:
+    """Asks the user to enter a text and returns the entered text together with whether the dialog has been accepted
+    (like QInputDialog.getText). The dialog is shown in front of the window of ``parent``.
+
+    Notes
+    -----
+    QInputDialog.getText constructs a new dialog on every call, so we reuse a single one instead.
+    """
+    window = parent.window()
+    if input_dialog.parentWidget() is not window:
+        input_dialog.setParent(window, Qt.Dialog)  # Keep it a separate (dialog) window instead of a child widget
+    input_dialog.setWindowTitle(title)
+    input_dialog.setLabelText(label)
+    input_dialog.setTextValue("")  # Don't show the text entered the last time
+    accepted = input_dialog.exec_() == QDialog.Accepted
+    return input_dialog.textValue(), accepted
 
 
 def rebuild_gui():
@@ -48,29 +66,38 @@ def rebuild_gui():
 
     Notes
     -----
-    Call this if the state has changed significantly/in an unknown way.
+    Call this if the state has changed significantly/in an unknown way. Collections that still show the same registers,
+    lists or functions (e.g. after restoring a snapshot in which only values differ) keep their widgets and only
+    update the displayed values.
     """
-    # Rebuild prompt
-    rebuild_prompt()
-
-    # Rebuild register collection
-    register_collection.rebuild()
-
-    # Rebuild list collection
-    list_collection.rebuild()
-
-    # Rebuild custom function collection
-    custom_function_collection.rebuild()
-
-    # Rebuild selected collection
-    selected_manager.rebuild_collection()
-
-    # Rebuild temporary collection (only needed if we are in demonstration mode)
-    # NOTE: The scenario where we only want to clear the shown temporaries and not get a list of current temps (for
-    #  example because there is no valid demonstration anymore due to undo) does not occur: If we switch from
-    #  interactive to demonstration mode, we create a snapshot where no temporaries are displayed in the GUI. Hence,
-    #  it is not possible to go from demonstration back to interactive mode with (invalid) temporaries shown in
-    #  the GUI using undo, as we will restore the snapshot where we are in demonstration mode without any generated
-    #  temporaries on the way to interactive mode.
-    if state.is_demonstration():
-        temporary_collection.rebuild()
+    # Disable updates of the whole window while rebuilding, so Qt only lays out and repaints it once at the end (instead
+    # of after every widget that is added or removed)
+    window = prompt.window()
+    window.setUpdatesEnabled(False)
+    try:
+        # Rebuild prompt
+        rebuild_prompt()
+
+        # Rebuild register collection
+        register_collection.rebuild()
+
+        # Rebuild list collection
+        list_collection.rebuild()
+
+        # Rebuild custom function collection
+        custom_function_collection.rebuild()
+
+        # Rebuild selected collection
+        selected_manager.rebuild_collection()
+
+        # Rebuild temporary collection (only needed if we are in demonstration mode)
+        # NOTE: The scenario where we only want to clear the shown temporaries and not get a list of current temps (for
+        #  example because there is no valid demonstration anymore due to undo) does not occur: If we switch from
+        #  interactive to demonstration mode, we create a snapshot where no temporaries are displayed in the GUI. Hence,
+        #  it is not possible to go from demonstration back to interactive mode with (invalid) temporaries shown in
+        #  the GUI using undo, as we will restore the snapshot where we are in demonstration mode without any generated
+        #  temporaries on the way to interactive mode.
+        if state.is_demonstration():
+            temporary_collection.rebuild()
+    finally:
+        window.setUpdatesEnabled(True)
@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (
 )
 
 from gui import singletons
-from gui.helper_widgets import ClickableLabel
+from gui.helper_widgets import ClickableLabel, remove_widget, sync_widgets
 
 
 class TemporaryCollection(QGroupBox):
@@ -15,18 +15,37 @@ class TemporaryCollection(QGroupBox):
         self.setLayout(self._temporaries_collection)
 
     def create_temp_widget(self, identifier: str):
-        computation = " ".join(singletons.state.get_computation(identifier))
-        label = f"{identifier} = {singletons.state.get_value(identifier)} [{computation}]"
-        temp_widget = ClickableLabel(identifier, label)
-        singletons.selected_manager.watch_widget(temp_widget)
-        self._temporaries_collection.addWidget(temp_widget)
+        self._temporaries_collection.addWidget(_make_temp_widget(identifier))
 
     def clear_all(self):
         # https://stackoverflow.com/questions/4528347/clear-all-widgets-in-a-layout-in-pyqt
         for i in reversed(range(self._temporaries_collection.count())):
-            self._temporaries_collection.itemAt(i).widget().deleteLater()
+            remove_widget(self._temporaries_collection, self._temporaries_collection.itemAt(i).widget())
 
     def rebuild(self):
-        self.clear_all()
-        for temp in singletons.state.get_temp_names():
-            self.create_temp_widget(temp)
+        # Only the new temporaries (usually just one, e.g. after recurse) are added, cp. sync_widgets
+        self.setUpdatesEnabled(False)  # Don't repaint after every single change (cp. SelectedCollection.rebuild)
+        try:
+            sync_widgets(self._temporaries_collection, singletons.state.get_temp_names(), _make_temp_widget)
+        finally:
+            self.setUpdatesEnabled(True)
+
+
+def _make_temp_widget(identifier: str) -> "TemporaryWidget":
+    """Returns a new widget for temporary ``identifier``, which is watched by the selected manager"""
+    temp_widget = TemporaryWidget(identifier)
+    singletons.selected_manager.watch_widget(temp_widget)
+    return temp_widget
+
+
+class TemporaryWidget(ClickableLabel):
+    """Label representing a temporary together with its value and the computation generating it"""
+
+    def __init__(self, identifier: str):
+        super().__init__(identifier, "")
+        self.refresh()
+
+    def refresh(self):
+        # A temporary with the same name can have another value/computation after undo/redo (e.g. in another branch)
+        computation = " ".join(singletons.state.get_computation(self.identifier))
+        self.setText(f"{self.identifier} = {singletons.state.get_value(self.identifier)} [{computation}]")
@@ -1,4 +1,5 @@
 import copy
+from collections import deque
 
 
 class Snapper:
@@ -6,8 +7,9 @@ class Snapper:
 
     Attributes
     ----------
-    _snapshots : list[object]
-        Keeps track of all snapshots
+    _snapshots : deque[object]
+        Keeps track of all snapshots (holds exactly _history_size entries, the oldest snapshot being dropped when a new
+        one is added to a full history)
     _current_snapshot : int
         Keeps track of current snapshot
     _last_valid : int
@@ -30,7 +32,7 @@ class Snapper:
         """
         if history_size < 2:
             raise ValueError(f"history_size should be at least 2.")
-        self._snapshots = [None] * history_size  # https://stackoverflow.com/a/10712044
+        self._snapshots = deque([None] * history_size, maxlen=history_size)
         self._current_snapshot = -1
         self._last_valid = -1
         self._history_size = history_size
@@ -45,10 +47,8 @@ class Snapper:
         """
         # We already have _history_size many valid snapshots
         if self._current_snapshot == self._history_size - 1:
-            # https://stackoverflow.com/a/23903661
+            # The deque drops the oldest snapshot in O(1) (instead of copying the remaining snapshots into a new list)
             self._snapshots.append(copy.deepcopy(obj))
-            # Set the last self._history_size snapshots as the new snapshot list
-            self._snapshots = self._snapshots[-self._history_size:]
             # No need to change _current_snapshot, as it already points to the last element
         else:
             self._current_snapshot += 1